@@ -20,8 +20,13 @@ def backfill(
     max_pages: int = 100,
     custom_url: str | None = None,
     settings: Settings | None = None,
+    concurrent_pages: int = 1,
 ) -> None:
-    """Perform historical backfill from HTML browse pages."""
+    """Perform historical backfill from HTML browse pages.
+
+    With ``concurrent_pages`` above 1, pages are fetched that many at a time,
+    still pausing between each group.
+    """
     if settings is None:
         settings = Settings()
     db = Database(settings.db_path)
@@ -33,7 +38,9 @@ def backfill(
         follow_redirects=True,
     )
 
-    scraper = HtmlScraper(db, client, custom_url=custom_url)
+    scraper = HtmlScraper(
+        db, client, custom_url=custom_url, parse_workers=settings.guessit_workers
+    )
 
     logger.info(f"Starting backfill for up to {max_pages} pages")
     if custom_url:
@@ -45,11 +52,18 @@ def backfill(
     total_processed = 0
 
     try:
-        for page in range(1, max_pages + 1):
-            logger.info(f"Processing page {page}/{max_pages}")
+        for page in range(1, max_pages + 1, concurrent_pages):
+            pages = list(range(page, min(page + concurrent_pages, max_pages + 1)))
+            if len(pages) == 1:
+                logger.info(f"Processing page {page}/{max_pages}")
+            else:
+                logger.info(f"Processing pages {page}-{pages[-1]}/{max_pages}")
 
             try:
-                processed = scraper.process_page(page=page)
+                if len(pages) == 1:
+                    processed = scraper.process_page(page=page)
+                else:
+                    processed = scraper.process_pages(pages)
                 total_processed += processed
 
                 # Rate limit - be nice to the server
@@ -62,6 +76,9 @@ def backfill(
 
         logger.info(f"Backfill complete. Total processed: {total_processed} torrents")
 
+        # Bulk ingestion skews the planner statistics from init
+        db.analyze()
+
         # Show final metrics
         from .scheduler import Scheduler
 
@@ -111,18 +128,32 @@ def main() -> None:
         type=str,
         help="Custom Nyaa URL to scrape (e.g., https://nyaa.si/user/subsplease or https://nyaa.si/?f=0&c=1_2&q=underwater)",
     )
+    parser.add_argument(
+        "--concurrent-pages",
+        type=int,
+        default=1,
+        help="Number of pages to fetch at a time (default: 1)",
+    )
+    parser.add_argument(
+        "--guessit-workers",
+        type=int,
+        default=settings.guessit_workers,
+        help="Number of processes to parse pages in when fetching several at a "
+        f"time (default: {settings.guessit_workers})",
+    )
 
     args = parser.parse_args()
 
     # Update settings with command line args
     settings.db_path = args.db_path
     settings.log_level = args.log_level
+    settings.guessit_workers = args.guessit_workers
 
     # Reconfigure logging with new level
     logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
 
     try:
-        backfill(args.max_pages, args.url, settings)
+        backfill(args.max_pages, args.url, settings, args.concurrent_pages)
     except KeyboardInterrupt:
         logger.info("Backfill interrupted by user")
         sys.exit(0)
@@ -18,6 +18,18 @@ class Settings(BaseSettings, cli_parse_args=True):
     rss_fetch_interval_hours: int = Field(
         default=1, description="Interval between RSS fetches in hours"
     )
+    rss_pages: int = Field(
+        default=1, description="Number of RSS feed pages to fetch concurrently"
+    )
+    rss_http2: bool = Field(
+        default=False,
+        description="Use HTTP/2 for RSS requests (requires the httpx[http2] extra)",
+    )
+    guessit_workers: int = Field(
+        default=1,
+        description="Number of processes to run guessit in for RSS entries and "
+        "backfill pages",
+    )
 
     # Tracker
     tracker_url: str = Field(
@@ -27,9 +39,17 @@ class Settings(BaseSettings, cli_parse_args=True):
     scrape_batch_size: int = Field(
         default=20, description="Number of torrents to scrape in one batch"
     )
+    scrape_concurrency: int = Field(
+        default=1, description="Number of scrape batches to request concurrently"
+    )
     scrape_window_minutes: int = Field(
         default=30, description="Minutes ahead to include torrents in batching window"
     )
+    metrics_ttl: float = Field(
+        default=5.0,
+        description="Seconds to reuse metrics and schedule summary results for "
+        "(0 disables caching)",
+    )
 
     # Logging
     log_level: str = Field(
@@ -10,6 +10,29 @@ from whenever import Instant
 from .models import StatsData, TorrentData
 
 logger = logging.getLogger(__name__)
+# Executed statements are logged here at DEBUG level
+sql_logger = logging.getLogger(f"{__name__}.sql")
+
+# Prepared statements kept per connection. Every IN (...) list length is its
+# own statement, so batch lookups of varying size need room beyond the fixed
+# queries for those not to be evicted
+STATEMENT_CACHE_SIZE = 256
+
+# Stats rows per multi-row INSERT in Database.insert_stats_many. Each statement
+# then does the work of many executemany steps; with 5 parameters per row this
+# stays far below SQLite's bound parameter limit
+STATS_INSERT_BATCH = 100
+
+# Compact JSON for stored guessit data; built once, where json.dumps with
+# non-default arguments would build a new encoder per call
+_encode_json = json.JSONEncoder(separators=(",", ":")).encode
+
+# TorrentData's fields as a plain tuple, for Database.insert_torrent_rows:
+# (infohash, filename, pubdate, size_bytes, nyaa_id, trusted, remake, seeders,
+#  leechers, downloads, guessit_data)
+TorrentRow = tuple[
+    str, str, Instant, int, int | None, bool, bool, int, int, int, dict | None
+]
 
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS torrents (
@@ -23,7 +46,24 @@ CREATE TABLE IF NOT EXISTS torrents (
     status TEXT DEFAULT 'active',
 
     -- Guessit data as JSON
-    guessit_data TEXT
+    guessit_data TEXT,
+
+    -- When the time-decay schedule next wants stats, NULL once it never will
+    next_scrape_due TEXT,
+
+    -- When the torrent leaves each tier of the time-decay schedule
+    hourly_until TEXT GENERATED ALWAYS AS (
+        strftime('%Y-%m-%dT%H:%M:%SZ', pubdate, '+2 days')
+    ) VIRTUAL,
+    every_4h_until TEXT GENERATED ALWAYS AS (
+        strftime('%Y-%m-%dT%H:%M:%SZ', pubdate, '+7 days')
+    ) VIRTUAL,
+    daily_until TEXT GENERATED ALWAYS AS (
+        strftime('%Y-%m-%dT%H:%M:%SZ', pubdate, '+30 days')
+    ) VIRTUAL,
+    weekly_until TEXT GENERATED ALWAYS AS (
+        strftime('%Y-%m-%dT%H:%M:%SZ', pubdate, '+180 days')
+    ) VIRTUAL
 );
 
 CREATE TABLE IF NOT EXISTS stats (
@@ -36,10 +76,117 @@ CREATE TABLE IF NOT EXISTS stats (
     FOREIGN KEY (infohash) REFERENCES torrents(infohash)
 );
 
-CREATE INDEX IF NOT EXISTS idx_stats_infohash ON stats(infohash);
 CREATE INDEX IF NOT EXISTS idx_stats_timestamp ON stats(timestamp);
+-- Covers the newest-first stats reads per torrent (recent stats, dead torrent
+-- checks), so they never visit the table rows
+CREATE INDEX IF NOT EXISTS idx_stats_recent
+    ON stats(infohash, timestamp DESC, seeders, leechers, downloads);
+-- Lookups by infohash alone are served by the primary key and idx_stats_recent
+DROP INDEX IF EXISTS idx_stats_infohash;
 CREATE INDEX IF NOT EXISTS idx_torrents_pubdate ON torrents(pubdate);
 CREATE INDEX IF NOT EXISTS idx_torrents_status ON torrents(status);
+-- Scheduler queries only look at active torrents, filtered by pubdate
+CREATE INDEX IF NOT EXISTS idx_torrents_active ON torrents(pubdate)
+    WHERE status = 'active';
+-- Due torrents are only ever looked up among active ones, ordered by due time
+CREATE INDEX IF NOT EXISTS idx_torrents_active_due ON torrents(next_scrape_due)
+    WHERE status = 'active';
+
+-- Latest stats timestamp per torrent, kept in sync by the triggers below so the
+-- scheduler doesn't have to aggregate the whole stats table.
+CREATE TABLE IF NOT EXISTS torrent_last_scrape (
+    infohash TEXT PRIMARY KEY,
+    last_scrape TEXT NOT NULL
+);
+
+-- Scheduling state per torrent, for the scheduler's classification queries
+DROP VIEW IF EXISTS v_scrape_schedule;
+CREATE VIEW v_scrape_schedule AS
+SELECT t.infohash, t.status, t.pubdate, s.last_scrape, t.next_scrape_due
+FROM torrents t
+LEFT JOIN torrent_last_scrape s ON t.infohash = s.infohash;
+
+-- Next due scrape per torrent under the time-decay schedule: hourly for the
+-- first 2 days after publication, every 4 hours until day 7, daily until day
+-- 30, weekly until day 180, then never (see the torrents *_until columns).
+-- The next scrape is the first interval after the last one that still falls
+-- inside its tier, or the start of a later tier if the interval overshoots.
+-- Never scraped torrents are due right away. The view is recreated on init so
+-- changes to it reach existing databases.
+DROP VIEW IF EXISTS torrent_next_scrape;
+CREATE VIEW torrent_next_scrape AS
+SELECT
+    infohash,
+    CASE
+        WHEN last_scrape IS NULL THEN pubdate
+        WHEN after_1h <= hourly_until THEN after_1h
+        WHEN MAX(after_4h, hourly_until) <= every_4h_until
+            THEN MAX(after_4h, hourly_until)
+        WHEN MAX(after_1d, every_4h_until) <= daily_until
+            THEN MAX(after_1d, every_4h_until)
+        WHEN MAX(after_7d, daily_until) <= weekly_until
+            THEN MAX(after_7d, daily_until)
+    END AS next_scrape_due
+FROM (
+    SELECT
+        t.infohash,
+        t.pubdate,
+        t.hourly_until,
+        t.every_4h_until,
+        t.daily_until,
+        t.weekly_until,
+        s.last_scrape,
+        strftime('%Y-%m-%dT%H:%M:%SZ', s.last_scrape, '+1 hours') AS after_1h,
+        strftime('%Y-%m-%dT%H:%M:%SZ', s.last_scrape, '+4 hours') AS after_4h,
+        strftime('%Y-%m-%dT%H:%M:%SZ', s.last_scrape, '+1 days') AS after_1d,
+        strftime('%Y-%m-%dT%H:%M:%SZ', s.last_scrape, '+7 days') AS after_7d
+    FROM torrents t
+    LEFT JOIN torrent_last_scrape s ON t.infohash = s.infohash
+);
+
+-- Triggers are recreated on init, like the view, so changes reach existing
+-- databases.
+DROP TRIGGER IF EXISTS stats_last_scrape_insert;
+CREATE TRIGGER stats_last_scrape_insert
+AFTER INSERT ON stats
+BEGIN
+    INSERT INTO torrent_last_scrape (infohash, last_scrape)
+    VALUES (NEW.infohash, NEW.timestamp)
+    ON CONFLICT(infohash) DO UPDATE
+    SET last_scrape = MAX(last_scrape, excluded.last_scrape);
+    UPDATE torrents SET next_scrape_due = (
+        SELECT next_scrape_due FROM torrent_next_scrape
+        WHERE infohash = NEW.infohash
+    )
+    WHERE infohash = NEW.infohash;
+END;
+
+DROP TRIGGER IF EXISTS stats_last_scrape_delete;
+CREATE TRIGGER stats_last_scrape_delete
+AFTER DELETE ON stats
+BEGIN
+    DELETE FROM torrent_last_scrape WHERE infohash = OLD.infohash;
+    -- Reads only the newest index entry for the torrent
+    INSERT INTO torrent_last_scrape (infohash, last_scrape)
+    SELECT infohash, timestamp FROM stats
+    WHERE infohash = OLD.infohash
+    ORDER BY timestamp DESC
+    LIMIT 1;
+    UPDATE torrents SET next_scrape_due = (
+        SELECT next_scrape_due FROM torrent_next_scrape
+        WHERE infohash = OLD.infohash
+    )
+    WHERE infohash = OLD.infohash;
+END;
+
+-- HTTP validators from the last successful fetch of each feed URL, used to
+-- send conditional requests on the next poll.
+CREATE TABLE IF NOT EXISTS feed_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT
+);
 
 -- Cached external rating/ranking data keyed by AniList id (e.g. MyAnimeList via Jikan).
 CREATE TABLE IF NOT EXISTS external_ratings (
@@ -67,6 +214,14 @@ CREATE TABLE IF NOT EXISTS niconico_survey (
 );
 """
 
+# Generated tier boundary columns on torrents, as offsets from pubdate
+_SCHEDULE_TIER_OFFSETS = {
+    "hourly_until": "+2 days",
+    "every_4h_until": "+7 days",
+    "daily_until": "+30 days",
+    "weekly_until": "+180 days",
+}
+
 
 class Database:
     def __init__(
@@ -79,15 +234,75 @@ class Database:
         self.now_func = now_func
         self.init_db()
 
+    @classmethod
+    def from_template(
+        cls,
+        template: "Database",
+        now_func: Callable[[], Instant] = Instant.now,
+    ) -> "Database":
+        """Create an in-memory database copied from an initialized one.
+
+        The copy is made with SQLite's backup API, which is much cheaper than
+        running init_db again, e.g. for a fresh database per test.
+        """
+        db = cls.__new__(cls)
+        db.db_path = ":memory:"
+        db._memory_conn = db._connect()
+        db.now_func = now_func
+        with template.get_conn() as conn:
+            conn.backup(db._memory_conn)
+        return db
+
     def init_db(self) -> None:
         """Initialize the database with schema."""
         with self.get_conn() as conn:
-            # Only enable WAL mode for file-based databases, not in-memory
+            # Only enable WAL mode for file-based databases, not in-memory.
+            # The journal mode is persistent; per-connection pragmas are set in
+            # _configure_connection.
             if self.db_path != ":memory:":
                 conn.execute("PRAGMA journal_mode=WAL")
-                conn.execute("PRAGMA synchronous=NORMAL")
+
+            # Databases created before next_scrape_due need the column
+            columns = {
+                row["name"] for row in conn.execute("PRAGMA table_xinfo(torrents)")
+            }
+            add_next_scrape_due = bool(columns) and "next_scrape_due" not in columns
+            if add_next_scrape_due:
+                conn.execute("ALTER TABLE torrents ADD COLUMN next_scrape_due TEXT")
+            # Tier boundaries are virtual, so older databases can gain them in place
+            for column, offset in _SCHEDULE_TIER_OFFSETS.items():
+                if columns and column not in columns:
+                    conn.execute(
+                        f"""
+                        ALTER TABLE torrents ADD COLUMN {column} TEXT
+                        GENERATED ALWAYS AS (
+                            strftime('%Y-%m-%dT%H:%M:%SZ', pubdate, '{offset}')
+                        ) VIRTUAL
+                        """
+                    )
 
             conn.executescript(SCHEMA)
+
+            # Populate last scrape times for databases created before the table
+            conn.execute(
+                """
+                INSERT INTO torrent_last_scrape (infohash, last_scrape)
+                SELECT infohash, MAX(timestamp) FROM stats
+                WHERE NOT EXISTS (SELECT 1 FROM torrent_last_scrape)
+                GROUP BY infohash
+                """
+            )
+            if add_next_scrape_due:
+                conn.execute(
+                    """
+                    UPDATE torrents SET next_scrape_due = (
+                        SELECT next_scrape_due FROM torrent_next_scrape n
+                        WHERE n.infohash = torrents.infohash
+                    )
+                    """
+                )
+            # Refresh planner statistics for new or changed indexes
+            conn.execute("PRAGMA optimize")
             conn.commit()
 
     @contextmanager
@@ -96,21 +311,63 @@ class Database:
         if self.db_path == ":memory:":
             # For in-memory databases, maintain a persistent connection
             if self._memory_conn is None:
-                self._memory_conn = sqlite3.connect(
-                    self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-                )
-                self._memory_conn.row_factory = sqlite3.Row
-                self._register_adapters_converters(self._memory_conn)
+                self._memory_conn = self._connect()
             yield self._memory_conn
         else:
             # For file databases, create new connections as needed
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-            conn.row_factory = sqlite3.Row
-            self._register_adapters_converters(conn)
+            conn = self._connect()
+            self._configure_connection(conn)
             try:
                 yield conn
             finally:
-                conn.close()
+                try:
+                    # SQLite recommends this before closing a connection; it is
+                    # a no-op unless queries since opening would benefit from
+                    # fresh planner statistics. A failure here must not hide
+                    # an exception raised by the caller.
+                    conn.execute("PRAGMA optimize")
+                except sqlite3.Error as e:
+                    logger.warning(f"PRAGMA optimize failed: {e}")
+                finally:
+                    conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with row factory, adapters and statement caching."""
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            # Room for every distinct query, so repeats skip parsing and planning
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        self._register_adapters_converters(conn)
+        if sql_logger.isEnabledFor(logging.DEBUG):
+            # Log each statement SQLite runs, e.g. to check what gets re-run
+            conn.set_trace_callback(sql_logger.debug)
+        return conn
+
+    @staticmethod
+    def tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """Get a cursor returning plain tuples instead of sqlite3.Row.
+
+        For loops over many rows, which unpack columns by position rather than
+        paying for a lookup by name on each access.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    def _configure_connection(self, conn: sqlite3.Connection) -> None:
+        """Apply per-connection pragmas for file databases.
+
+        With WAL, synchronous=NORMAL only fsyncs at checkpoints: a power loss
+        can drop the last few commits but never corrupts the database, which
+        is fine for periodically re-scraped stats.
+        """
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
 
     def _register_adapters_converters(self, conn: sqlite3.Connection) -> None:
         """Register adapters and converters for custom types."""
@@ -130,15 +387,12 @@ class Database:
 
     def insert_torrent(self, torrent_data: TorrentData) -> None:
         """Insert a torrent with metadata and initial stats."""
-        with self.get_conn() as conn:
-            # Insert torrent metadata
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO torrents (
-                    infohash, filename, pubdate, size_bytes, nyaa_id,
-                    trusted, remake, guessit_data
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        self.insert_torrents_bulk([torrent_data])
+
+    def insert_torrents_bulk(self, torrents: list[TorrentData]) -> None:
+        """Insert many torrents with metadata and initial stats in one transaction."""
+        self.insert_torrent_rows(
+            [
                 (
                     torrent_data.infohash,
                     torrent_data.filename,
@@ -147,25 +401,75 @@ class Database:
                     torrent_data.nyaa_id,
                     torrent_data.trusted,
                     torrent_data.remake,
-                    json.dumps(torrent_data.guessit_data)
-                    if torrent_data.guessit_data
-                    else None,
-                ),
+                    torrent_data.seeders,
+                    torrent_data.leechers,
+                    torrent_data.downloads,
+                    torrent_data.guessit_data,
+                )
+                for torrent_data in torrents
+            ]
+        )
+
+    def insert_torrent_rows(self, rows: list[TorrentRow]) -> None:
+        """Insert torrents given as plain tuples, like insert_torrents_bulk.
+
+        Rows hold TorrentData's fields in declaration order. Building models is
+        skipped, which matters for bulk loads of known-good data such as
+        generated fake databases.
+        """
+        if not rows:
+            return
+
+        torrent_params = []
+        stats_params = []
+        for (
+            infohash,
+            filename,
+            pubdate,
+            size_bytes,
+            nyaa_id,
+            trusted,
+            remake,
+            seeders,
+            leechers,
+            downloads,
+            guessit_data,
+        ) in rows:
+            torrent_params.append(
+                (
+                    infohash,
+                    filename,
+                    pubdate,
+                    size_bytes,
+                    nyaa_id,
+                    trusted,
+                    remake,
+                    _encode_json(guessit_data) if guessit_data else None,
+                    # New torrents are due immediately
+                    pubdate,
+                )
+            )
+            stats_params.append((infohash, pubdate, seeders, leechers, downloads))
+
+        with self.get_conn() as conn:
+            # Insert torrent metadata
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO torrents (
+                    infohash, filename, pubdate, size_bytes, nyaa_id,
+                    trusted, remake, guessit_data, next_scrape_due
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                torrent_params,
             )
 
             # Insert initial stats from RSS
-            conn.execute(
+            conn.executemany(
                 """
                 INSERT OR IGNORE INTO stats (infohash, timestamp, seeders, leechers, downloads)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (
-                    torrent_data.infohash,
-                    torrent_data.pubdate,
-                    torrent_data.seeders,
-                    torrent_data.leechers,
-                    torrent_data.downloads,
-                ),
+                stats_params,
             )
 
             conn.commit()
@@ -177,20 +481,46 @@ class Database:
         if timestamp is None:
             timestamp = self.now_func().round()
 
+        self.insert_stats_many([(infohash, stats, timestamp)])
+
+    def insert_stats_bulk(
+        self, stats: dict[str, StatsData], timestamp: Instant | None = None
+    ) -> None:
+        """Insert statistics for many torrents at one timestamp in one transaction."""
+        if not stats:
+            return
+        if timestamp is None:
+            timestamp = self.now_func().round()
+
+        self.insert_stats_many(
+            [
+                (infohash, torrent_stats, timestamp)
+                for infohash, torrent_stats in stats.items()
+            ]
+        )
+
+    def insert_stats_many(self, items: list[tuple[str, StatsData, Instant]]) -> None:
+        """Insert (infohash, stats, timestamp) entries in one transaction."""
+        if not items:
+            return
+
+        params = [
+            (infohash, timestamp, stats.seeders, stats.leechers, stats.downloads)
+            for infohash, stats, timestamp in items
+        ]
         with self.get_conn() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO stats (infohash, timestamp, seeders, leechers, downloads)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    infohash,
-                    timestamp,
-                    stats.seeders,
-                    stats.leechers,
-                    stats.downloads,
-                ),
-            )
+            # Insert in multi-row VALUES chunks; later rows replace earlier ones
+            # with the same key, as they would inserted one at a time
+            for start in range(0, len(params), STATS_INSERT_BATCH):
+                chunk = params[start : start + STATS_INSERT_BATCH]
+                values = ", ".join(["(?, ?, ?, ?, ?)"] * len(chunk))
+                conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO stats (infohash, timestamp, seeders, leechers, downloads)
+                    VALUES {values}
+                    """,
+                    [value for row in chunk for value in row],
+                )
             conn.commit()
 
     def mark_torrent_status(self, infohash: str, status: str) -> None:
@@ -202,6 +532,39 @@ class Database:
             )
             conn.commit()
 
+    def mark_torrents_status(self, infohashes: list[str], status: str) -> None:
+        """Mark several torrents with a specific status in one statement."""
+        if not infohashes:
+            return
+
+        placeholders = ",".join("?" * len(infohashes))
+        with self.get_conn() as conn:
+            conn.execute(
+                f"UPDATE torrents SET status = ? WHERE infohash IN ({placeholders})",
+                (status, *infohashes),
+            )
+            conn.commit()
+
+    def get_known_torrents(self, infohashes: list[str]) -> dict[str, bool]:
+        """Look up which of the given torrents are already stored.
+
+        Returns a mapping of each stored infohash to whether it has guessit data.
+        """
+        if not infohashes:
+            return {}
+
+        placeholders = ",".join("?" * len(infohashes))
+        with self.get_conn() as conn:
+            cursor = self.tuple_cursor(conn).execute(
+                f"""
+                SELECT infohash, guessit_data IS NOT NULL as has_guessit
+                FROM torrents
+                WHERE infohash IN ({placeholders})
+                """,
+                infohashes,
+            )
+            return {infohash: bool(has_guessit) for infohash, has_guessit in cursor}
+
     def get_torrent_exists(self, infohash: str) -> bool:
         """Check if a torrent exists in the database."""
         with self.get_conn() as conn:
@@ -226,6 +589,68 @@ class Database:
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_dead_torrents(self, infohashes: list[str], scrapes: int = 3) -> list[str]:
+        """Get which of the given torrents' last ``scrapes`` stats were all zero."""
+        if not infohashes:
+            return []
+
+        placeholders = ",".join("?" * len(infohashes))
+        with self.get_conn() as conn:
+            cursor = self.tuple_cursor(conn).execute(
+                f"""
+                WITH recent AS (
+                    SELECT
+                        infohash,
+                        seeders,
+                        leechers,
+                        downloads,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY infohash ORDER BY timestamp DESC
+                        ) as rn
+                    FROM stats
+                    WHERE infohash IN ({placeholders})
+                )
+                SELECT infohash
+                FROM recent
+                WHERE rn <= ?
+                GROUP BY infohash
+                HAVING COUNT(*) = ?
+                   AND MAX(seeders) = 0
+                   AND MAX(leechers) = 0
+                   AND MAX(downloads) = 0
+                """,
+                (*infohashes, scrapes, scrapes),
+            )
+            return [infohash for (infohash,) in cursor]
+
+    def get_feed_cache(self, url: str) -> dict[str, Any] | None:
+        """Get the cached HTTP validators for a feed URL, if any."""
+        with self.get_conn() as conn:
+            cursor = conn.execute(
+                "SELECT etag, last_modified, body_hash FROM feed_cache WHERE url = ?",
+                (url,),
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def upsert_feed_cache(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        body_hash: str | None = None,
+    ) -> None:
+        """Insert or replace the cached HTTP validators for a feed URL."""
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO feed_cache (url, etag, last_modified, body_hash)
+                VALUES (?, ?, ?, ?)
+                """,
+                (url, etag, last_modified, body_hash),
+            )
+            conn.commit()
+
     def get_external_ratings(self, source: str) -> dict[int, dict[str, Any]]:
         """Get all cached external ratings for a source, keyed by anilist_id.
 
@@ -342,6 +767,13 @@ class Database:
             )
             conn.commit()
 
+    def analyze(self) -> None:
+        """Rebuild planner statistics for the torrents and stats tables."""
+        with self.get_conn() as conn:
+            conn.execute("ANALYZE torrents")
+            conn.execute("ANALYZE stats")
+            conn.commit()
+
     def vacuum(self) -> None:
         """Vacuum the database for maintenance."""
         with self.get_conn() as conn:
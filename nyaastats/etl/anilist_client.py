@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+import sys
 from dataclasses import dataclass
 
 from gql import Client, gql
@@ -12,9 +13,18 @@ from .config import ANILIST_API_URL, MOVIE_DATE_RANGE, MOVIE_FORMATS, SeasonConf
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _intern(value: str | None) -> str | None:
+    """Intern a string from an API response, passing through None."""
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True, frozen=True)
 class AniListShow:
-    """Metadata from AniList API."""
+    """Metadata from AniList API.
+
+    Shows are immutable once parsed; strings from the API are interned, so
+    repeated values like status and format are stored once across shows.
+    """
 
     id: int
     title_romaji: str
@@ -324,19 +334,19 @@ class AniListClient:
 
         return AniListShow(
             id=media["id"],
-            title_romaji=title.get("romaji", ""),
-            title_english=title.get("english"),
-            title_native=title.get("native"),
-            synonyms=media.get("synonyms", []),
+            title_romaji=_intern(title.get("romaji", "")),
+            title_english=_intern(title.get("english")),
+            title_native=_intern(title.get("native")),
+            synonyms=[sys.intern(synonym) for synonym in media.get("synonyms") or []],
             episodes=media.get("episodes"),
-            status=media.get("status", ""),
+            status=_intern(media.get("status", "")),
             airing_schedule=[
                 (node["episode"], node["airingAt"]) for node in airing_schedule
             ],
             cover_image_url=cover_image.get("large"),
             cover_image_color=cover_image.get("color"),
             start_date=start_date,
-            format=media.get("format"),
+            format=_intern(media.get("format")),
             id_mal=media.get("idMal"),
             average_score=media.get("averageScore"),
             mean_score=media.get("meanScore"),
@@ -1,16 +1,96 @@
 """Fuzzy title matching for torrent-to-AniList attribution."""
 
+import bisect
+import functools
 import logging
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import pairwise
 
-from thefuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from .anilist_client import AniListShow
 from .config import EPISODE_SEASON_MAPPINGS, FUZZY_MATCH_THRESHOLD, TITLE_OVERRIDES
 
 logger = logging.getLogger(__name__)
 
+# Batches with fewer distinct entries than this are matched in-process even
+# with workers, since starting the pool would cost more than it saves
+PARALLEL_MATCH_MIN_ENTRIES = 2000
+
+# Characters dropped by FuzzyMatcher._normalize_title, after lowercasing
+_PUNCTUATION_PATTERN = re.compile(r"[^a-z0-9\s]")
+_LETTER_PATTERN = re.compile(r"[a-z]")
+
+# Season indicators in show titles: "season N" and "Nnd/Nrd/Nth season"
+_SEASON_PREFIX_PATTERN = re.compile(r"season (-?\d+)")
+_SEASON_SUFFIX_PATTERN = re.compile(r"(-?\d+)(?:nd|rd|th) season")
+
+# Distinct (title, season, episode) results each matcher keeps; re-runs see
+# mostly the same titles again
+MATCH_CACHE_SIZE = 8192
+
+# Matcher used by worker processes, set once per process by _init_match_worker
+_worker_matcher: "FuzzyMatcher | None" = None
+
+
+def _season_indicators(title: str) -> frozenset[str]:
+    """Season numbers a show title indicates, as strings.
+
+    Equivalent to checking whether "season N", "Nnd season", "Nrd season" or
+    "Nth season" appears in the lowercased title, including N matching part of
+    a longer number, so the check becomes a set lookup per show.
+    """
+    title_lower = title.lower()
+    seasons = set()
+    for number in _SEASON_PREFIX_PATTERN.findall(title_lower):
+        seasons.update(number[:end] for end in range(1, len(number) + 1))
+    for number in _SEASON_SUFFIX_PATTERN.findall(title_lower):
+        seasons.update(number[start:] for start in range(len(number)))
+    return frozenset(seasons)
+
+
+def _episode_segments(
+    ranges: list[tuple[int, int, AniListShow]],
+) -> tuple[list[int], list[int], list[AniListShow]]:
+    """Split (min_ep, max_ep, show) ranges into sorted, disjoint segments.
+
+    Each segment keeps the first listed range covering it, as scanning the
+    ranges in order would, so a lookup is a bisect on the segment starts.
+
+    Returns:
+        Parallel lists of segment start episodes, end episodes and shows
+    """
+    bounds = sorted({ep for min_ep, max_ep, _ in ranges for ep in (min_ep, max_ep + 1)})
+    starts, ends, shows = [], [], []
+    for start, next_start in pairwise(bounds):
+        for min_ep, max_ep, show in ranges:
+            if min_ep <= start <= max_ep:
+                starts.append(start)
+                ends.append(next_start - 1)
+                shows.append(show)
+                break
+    return starts, ends, shows
+
+
+def _sort_tokens(title: str) -> str:
+    """Sort a normalized title's words, as token_sort_ratio compares them."""
+    return " ".join(sorted(title.split()))
+
+
+def _init_match_worker(matcher: "FuzzyMatcher") -> None:
+    """Keep the matcher sent to a worker process, with its title index built."""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _match_in_worker(
+    entry: tuple[str, int | None, int | None],
+) -> tuple["TitleMatch | None", float | None]:
+    """Match a (title, season, episode) entry in a worker process."""
+    return _worker_matcher._match_cached(*entry)
+
 
 @dataclass
 class TitleMatch:
@@ -31,6 +111,7 @@ class FuzzyMatcher:
         shows: list[AniListShow],
         threshold: int = FUZZY_MATCH_THRESHOLD,
         overrides: dict[str, int] | None = None,
+        workers: int = 1,
     ):
         """Initialize fuzzy matcher.
 
@@ -38,10 +119,12 @@ class FuzzyMatcher:
             shows: List of AniList shows to match against
             threshold: Minimum fuzzy match score (0-100)
             overrides: Manual title overrides dict
+            workers: Processes to spread large match_batch calls over
         """
         self.shows = shows
         self.threshold = threshold
         self.overrides = overrides or TITLE_OVERRIDES
+        self.workers = workers
 
         # Build lookup index for shows
         self._show_by_id = {show.id: show for show in shows}
@@ -49,12 +132,62 @@ class FuzzyMatcher:
         # Build searchable title variants
         self._title_variants = self._build_title_index()
 
+        # Flat, parallel lists of every title variant, the show it belongs to
+        # and the seasons that show's title indicates, so matching scores plain
+        # strings without revisiting show objects. Variants are stored with
+        # their words sorted, which token_sort_ratio would otherwise redo for
+        # every comparison.
+        self._choices: list[str] = []
+        self._choice_show_ids: list[int] = []
+        self._choice_seasons: list[frozenset[str]] = []
+        for anilist_id, variants in self._title_variants.items():
+            show = self._show_by_id[anilist_id]
+            seasons = (
+                _season_indicators(show.title_romaji) if show.format else frozenset()
+            )
+            for variant in variants:
+                self._choices.append(_sort_tokens(variant))
+                self._choice_show_ids.append(anilist_id)
+                self._choice_seasons.append(seasons)
+
+        # Episode ranges per configured series as bisectable segments, keeping
+        # only ranges whose show is being matched against
+        self._episode_segments = {
+            series: _episode_segments(
+                [
+                    (min_ep, max_ep, self._show_by_id[anilist_id])
+                    for min_ep, max_ep, anilist_id in mappings
+                    if anilist_id in self._show_by_id
+                ]
+            )
+            for series, mappings in EPISODE_SEASON_MAPPINGS.items()
+        }
+
+        self._init_match_cache()
+
+    def _init_match_cache(self) -> None:
+        """Memoize match results per instance, so the cache dies with it."""
+        self._match_cached = functools.lru_cache(maxsize=MATCH_CACHE_SIZE)(
+            self._match_scored
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle without the match cache, which wraps a bound method."""
+        state = self.__dict__.copy()
+        del state["_match_cached"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore a pickled matcher, e.g. in a worker, with an empty cache."""
+        self.__dict__.update(state)
+        self._init_match_cache()
+
     def _is_informative_normalized_title(self, title: str) -> bool:
         """Check if normalized title has enough signal for fuzzy matching."""
         # Avoid empty/non-latin-normalized strings and low-information tokens
         # like "2" that can spuriously score 100 against similarly degenerate
         # AniList synonyms.
-        return len(title) >= 3 and bool(re.search(r"[a-z]", title))
+        return len(title) >= 3 and _LETTER_PATTERN.search(title) is not None
 
     def _build_title_index(self) -> dict[int, list[str]]:
         """Build index of normalized title variants per show.
@@ -104,24 +237,21 @@ class FuzzyMatcher:
         Returns:
             Normalized title
         """
-        # Lowercase
-        title = title.lower()
-
-        # Remove punctuation, keep only alphanumeric and spaces
-        title = re.sub(r"[^a-z0-9\s]", "", title)
-
-        # Collapse multiple spaces
-        title = re.sub(r"\s+", " ", title).strip()
+        # Lowercase, then remove punctuation, keeping only alphanumeric and
+        # whitespace
+        title = _PUNCTUATION_PATTERN.sub("", title.lower())
 
-        return title
+        # Collapse whitespace runs to single spaces and trim; str.split uses
+        # the same Unicode whitespace as the regex
+        return " ".join(title.split())
 
     def _episode_range_match(
-        self, torrent_title: str, episode: int | None
+        self, normalized_title: str, episode: int | None
     ) -> TitleMatch | None:
         """Match using episode number ranges for continuing series.
 
         Args:
-            torrent_title: Title extracted from torrent
+            normalized_title: Normalized title extracted from torrent
             episode: Episode number from guessit
 
         Returns:
@@ -130,27 +260,25 @@ class FuzzyMatcher:
         if episode is None:
             return None
 
-        normalized_title = self._normalize_title(torrent_title)
-
         # Check if this title has episode mappings configured
-        if normalized_title not in EPISODE_SEASON_MAPPINGS:
+        segments = self._episode_segments.get(normalized_title)
+        if segments is None:
             return None
 
-        # Find matching range
-        mappings = EPISODE_SEASON_MAPPINGS[normalized_title]
-        for min_ep, max_ep, anilist_id in mappings:
-            if min_ep <= episode <= max_ep:
-                show = self._show_by_id.get(anilist_id)
-                if show:
-                    return TitleMatch(
-                        anilist_id=anilist_id,
-                        score=100.0,
-                        method="episode_range",
-                        matched_title=show.title_romaji,
-                        season_matched=None,  # Episode ranges are explicit, not season-based
-                    )
+        # Find matching range: the last segment starting at or before the episode
+        starts, ends, shows = segments
+        index = bisect.bisect_right(starts, episode) - 1
+        if index < 0 or episode > ends[index]:
+            return None
 
-        return None
+        show = shows[index]
+        return TitleMatch(
+            anilist_id=show.id,
+            score=100.0,
+            method="episode_range",
+            matched_title=show.title_romaji,
+            season_matched=None,  # Episode ranges are explicit, not season-based
+        )
 
     def match(
         self,
@@ -168,29 +296,49 @@ class FuzzyMatcher:
         Returns:
             TitleMatch if a match is found, None otherwise
         """
+        return self._match_cached(torrent_title, season, episode)[0]
+
+    def _match_scored(
+        self,
+        torrent_title: str,
+        season: int | None = None,
+        episode: int | None = None,
+    ) -> tuple[TitleMatch | None, float | None]:
+        """Match torrent title to AniList show, keeping the best fuzzy score.
+
+        Args:
+            torrent_title: Title extracted from torrent filename (via guessit)
+            season: Season number from guessit (if available)
+            episode: Episode number from guessit (if available)
+
+        Returns:
+            Tuple of the TitleMatch (or None) and the best fuzzy score of the
+            full title without season bonus, or None if it wasn't scored
+        """
         normalized_torrent = self._normalize_title(torrent_title)
 
         # Skip fuzzy matching for low-information parsed titles
         if not self._is_informative_normalized_title(normalized_torrent):
-            return None
+            return None, None
 
         # Priority 1: Episode-range mapping (for continuing series)
-        episode_match = self._episode_range_match(torrent_title, episode)
+        episode_match = self._episode_range_match(normalized_torrent, episode)
         if episode_match:
-            return episode_match
+            return episode_match, None
 
         # Priority 2: Check manual overrides
         if normalized_torrent in self.overrides:
             anilist_id = self.overrides[normalized_torrent]
             show = self._show_by_id.get(anilist_id)
             if show:
-                return TitleMatch(
+                match = TitleMatch(
                     anilist_id=anilist_id,
                     score=100.0,
                     method="manual_override",
                     matched_title=show.title_romaji,
                     season_matched=season,
                 )
+                return match, None
 
         # Debug logging for specific titles
         if "oshi no ko" in normalized_torrent:
@@ -199,51 +347,21 @@ class FuzzyMatcher:
             )
 
         # Priority 3 & 4: Fuzzy matching (season-aware, then fallback)
-        best_score = 0.0
-        best_id = None
-        best_season_match = None  # Track if season-aware match worked
-
-        for anilist_id, variants in self._title_variants.items():
-            show = self._show_by_id[anilist_id]
-
-            for variant in variants:
-                # Use token_sort_ratio for better handling of word order differences
-                score = fuzz.token_sort_ratio(normalized_torrent, variant)
-
-                # Bonus for season-aware matching
-                # If guessit provides a season number and the show has matching format string
-                season_bonus = 0
-                if season is not None and show.format:
-                    # Check if show format indicates this is the correct season
-                    # AniList doesn't directly expose season numbers, so we use heuristics:
-                    # - Check if show title contains season indicators like "2nd Season", "Season 3"
-                    # This is a simplified heuristic; more sophisticated matching could be added
-                    title_lower = show.title_romaji.lower()
-                    if (
-                        f"season {season}" in title_lower
-                        or f"{season}nd season" in title_lower
-                        or f"{season}rd season" in title_lower
-                        or f"{season}th season" in title_lower
-                    ):
-                        season_bonus = 10  # Boost matches that have season indicators
-
-                adjusted_score = score + season_bonus
-
-                if adjusted_score > best_score:
-                    best_score = adjusted_score
-                    best_id = anilist_id
-                    best_season_match = season if season_bonus > 0 else None
+        best_score, best_id, best_season_match, plain_score = self._best_fuzzy_match(
+            normalized_torrent, season
+        )
 
         # Return match if above threshold
         if best_score >= self.threshold and best_id:
             show = self._show_by_id[best_id]
-            return TitleMatch(
+            match = TitleMatch(
                 anilist_id=best_id,
                 score=best_score,
                 method="season_aware" if best_season_match else "fuzzy",
                 matched_title=show.title_romaji,
                 season_matched=best_season_match,
             )
+            return match, plain_score
 
         # Fallback: strip subtitle after " - " (common in SubsPlease titles with
         # Japanese subtitles that tank fuzzy scores, e.g.
@@ -252,9 +370,72 @@ class FuzzyMatcher:
         if best_score < self.threshold and " - " in torrent_title:
             prefix = self._normalize_title(torrent_title.split(" - ")[0].strip())
             if self._is_informative_normalized_title(prefix) and len(prefix) >= 4:
-                return self._match_prefix_fallback(prefix, season)
+                return self._match_prefix_fallback(prefix, season), plain_score
 
-        return None
+        return None, plain_score
+
+    def _best_fuzzy_match(
+        self, normalized_title: str, season: int | None = None, min_score: float = 0
+    ) -> tuple[float, int | None, int | None, float]:
+        """Find the best scoring show for a normalized title.
+
+        Args:
+            normalized_title: Normalized title to score against every variant
+            season: Season number from guessit, enabling the season bonus
+            min_score: Score below which no match is wanted; when no variant
+                can reach it, scoring stops early and all scores are 0
+
+        Returns:
+            Tuple of (best score, anilist_id, season if the bonus applied,
+            best score without the season bonus)
+        """
+        # Bonus for season-aware matching: AniList doesn't expose season
+        # numbers, so boost shows whose title has a season indicator like
+        # "2nd Season" or "Season 3" matching guessit's season
+        season_key = str(season) if season is not None else None
+        max_bonus = 10 if season_key is not None else 0
+
+        # Use token_sort_ratio for better handling of word order differences:
+        # the ratio of the word-sorted titles. Titles are normalized up front,
+        # so RapidFuzz's own preprocessing is skipped; scores are rounded the
+        # way thefuzz reported them, so the threshold and override notes keep
+        # their meaning.
+        query = _sort_tokens(normalized_title)
+        best = process.extractOne(
+            query,
+            self._choices,
+            scorer=fuzz.ratio,
+            score_cutoff=max(min_score - max_bonus - 0.5, 0),
+        )
+        if best is None:
+            return 0.0, None, None, 0.0
+        plain_score = round(best[1])
+
+        # Only variants that reach the best plain score with the bonus can win.
+        # The cutoff lets RapidFuzz skip the rest without fully scoring them,
+        # and ties still go to the earliest variant.
+        candidates = process.extract(
+            query,
+            self._choices,
+            scorer=fuzz.ratio,
+            limit=None,
+            score_cutoff=max(plain_score - max_bonus - 0.5, 0),
+        )
+        candidates.sort(key=lambda candidate: candidate[2])
+
+        best_score = 0.0
+        best_id = None
+        best_season_match = None
+        for _, score, index in candidates:
+            season_bonus = 10 if season_key in self._choice_seasons[index] else 0
+            adjusted_score = round(score) + season_bonus
+
+            if adjusted_score > best_score:
+                best_score = adjusted_score
+                best_id = self._choice_show_ids[index]
+                best_season_match = season if season_bonus > 0 else None
+
+        return best_score, best_id, best_season_match, plain_score
 
     def _match_prefix_fallback(
         self, prefix: str, season: int | None
@@ -281,15 +462,11 @@ class FuzzyMatcher:
                     season_matched=season,
                 )
 
-        best_score = 0.0
-        best_id = None
-
-        for anilist_id, variants in self._title_variants.items():
-            for variant in variants:
-                score = fuzz.token_sort_ratio(prefix, variant)
-                if score > best_score:
-                    best_score = score
-                    best_id = anilist_id
+        # Only a match reaching the threshold is used, so RapidFuzz can skip
+        # variants that can't get there
+        best_score, best_id, _, _ = self._best_fuzzy_match(
+            prefix, min_score=self.threshold
+        )
 
         if best_score >= self.threshold and best_id:
             show = self._show_by_id[best_id]
@@ -303,6 +480,21 @@ class FuzzyMatcher:
 
         return None
 
+    def _match_in_pool(
+        self, entries: list[tuple[str, int | None, int | None]]
+    ) -> list[tuple[TitleMatch | None, float | None]]:
+        """Match (title, season, episode) entries in a process pool.
+
+        Scoring is mostly Python glue around RapidFuzz, so threads would
+        serialize on the GIL. Each worker receives the matcher once.
+        """
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_match_worker,
+            initargs=(self,),
+        ) as pool:
+            return list(pool.map(_match_in_worker, entries, chunksize=200))
+
     def match_batch(
         self,
         torrent_titles: list[tuple[str, str, int | None, int | None]],
@@ -320,26 +512,26 @@ class FuzzyMatcher:
         matched = []
         unmatched = []
 
+        # Torrents of the same release share (title, season, episode), so each
+        # distinct entry is matched once. The best fuzzy score reported for
+        # unmatched titles comes from the same scoring pass.
+        entries = list(
+            dict.fromkeys(
+                (title, season, episode) for _, title, season, episode in torrent_titles
+            )
+        )
+        if self.workers > 1 and len(entries) >= PARALLEL_MATCH_MIN_ENTRIES:
+            results = dict(zip(entries, self._match_in_pool(entries), strict=True))
+        else:
+            results = {entry: self._match_cached(*entry) for entry in entries}
+
         for identifier, title, season, episode in torrent_titles:
-            match_result = self.match(title, season=season, episode=episode)
+            match_result, best_score = results[(title, season, episode)]
 
             if match_result:
                 matched.append((identifier, match_result))
             else:
-                # For unmatched, try to get best score for debugging
-                normalized = self._normalize_title(title)
-                if not self._is_informative_normalized_title(normalized):
-                    unmatched.append((identifier, title, None))
-                    continue
-                best_score = 0.0
-                for variants in self._title_variants.values():
-                    for variant in variants:
-                        score = fuzz.token_sort_ratio(normalized, variant)
-                        best_score = max(best_score, score)
-
-                unmatched.append(
-                    (identifier, title, best_score if best_score > 0 else None)
-                )
+                unmatched.append((identifier, title, best_score or None))
 
         # Log matching statistics by method
         method_counts = {}
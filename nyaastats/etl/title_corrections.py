@@ -4,6 +4,8 @@ This module contains mappings to fix known parsing issues in guessit,
 such as false-positive language detection that truncates titles.
 """
 
+import functools
+
 # Title corrections to apply before fuzzy matching
 # Maps incorrect parsed title -> correct title
 TITLE_CORRECTIONS: dict[str, str] = {
@@ -14,6 +16,9 @@ TITLE_CORRECTIONS: dict[str, str] = {
 }
 
 
+# Torrents of the same show repeat titles heavily, so results are cached;
+# call apply_title_corrections.cache_clear() after changing TITLE_CORRECTIONS
+@functools.lru_cache(maxsize=65536)
 def apply_title_corrections(title: str | None) -> str | None:
     """Apply known title corrections to fix guessit parsing errors.
 
@@ -26,11 +31,5 @@ def apply_title_corrections(title: str | None) -> str | None:
     if title is None:
         return None
 
-    # Normalize for lookup (lowercase)
-    normalized = title.lower().strip()
-
-    # Apply correction if found
-    if normalized in TITLE_CORRECTIONS:
-        return TITLE_CORRECTIONS[normalized]
-
-    return title
+    # Normalize for lookup (lowercase) and apply correction if found
+    return TITLE_CORRECTIONS.get(title.strip().lower(), title)
@@ -41,6 +41,7 @@ async def run_etl_pipeline(
     fuzzy_threshold: int = 85,
     use_mock_anilist: bool = False,
     skip_external_ratings: bool = False,
+    match_workers: int = 1,
 ):
     """Run the complete ETL pipeline.
 
@@ -50,6 +51,7 @@ async def run_etl_pipeline(
         fuzzy_threshold: Minimum fuzzy match score (0-100)
         use_mock_anilist: Use mock AniList data instead of real API
         skip_external_ratings: Use cached external ratings without refreshing
+        match_workers: Processes to spread fuzzy matching of large batches over
     """
     logger.info("=" * 80)
     logger.info("Starting nyaastats ETL pipeline")
@@ -94,92 +96,45 @@ async def run_etl_pipeline(
     aggregator = DownloadAggregator(db_path)
 
     try:
-        # Get all torrents for initial fuzzy matching
+        # Get all torrents for initial fuzzy matching, projecting the guessit
+        # title, season and episode in SQLite instead of decoding the JSON here
         query = f"""
         SELECT
             infohash,
-            guessit_data
+            json_extract(guessit_data, '$.title') as title,
+            -- Only integer seasons, skip arrays (batch releases like [1,2,3])
+            CASE
+                WHEN json_type(guessit_data, '$.season') = 'integer'
+                THEN json_extract(guessit_data, '$.season')
+            END as season,
+            -- Single episodes, or the first of an episode list
+            CASE
+                WHEN json_type(guessit_data, '$.episode') = 'integer'
+                THEN json_extract(guessit_data, '$.episode')
+                WHEN json_type(guessit_data, '$.episode[0]') = 'integer'
+                THEN json_extract(guessit_data, '$.episode[0]')
+            END as episode
         FROM torrents
         WHERE pubdate >= '{MVP_SEASONS[0].start_date.format_common_iso()}'
             AND (status IS NULL OR status != 'guessit_failed')
             AND guessit_data IS NOT NULL
+            AND json_valid(guessit_data)
+            AND json_type(guessit_data, '$.title') = 'text'
         """
 
         torrents_raw = pl.read_database(query, connection=aggregator.sqlite_conn)
         logger.info(f"Loaded {len(torrents_raw)} torrents")
 
-        # Parse guessit data to extract metadata for fuzzy matching
-        import json
-
-        def extract_metadata(guessit_json: str) -> dict:
-            """Extract title, season, and episode from guessit JSON.
-
-            Returns:
-                Dict with 'title', 'season', and 'episode' keys (all may be None)
-            """
-            try:
-                data = json.loads(guessit_json)
-                title = data.get("title")
-                season = data.get("season")
-                episode = data.get("episode")
-
-                # Apply title corrections to fix guessit parsing errors
-                corrected_title = apply_title_corrections(title)
-
-                # Only use integer seasons, skip arrays (batch releases like [1,2,3])
-                season_int = season if isinstance(season, int) else None
-
-                # For episodes, handle both single int and lists (take first if list)
-                if isinstance(episode, list) and len(episode) > 0:
-                    episode_int = episode[0] if isinstance(episode[0], int) else None
-                elif isinstance(episode, int):
-                    episode_int = episode
-                else:
-                    episode_int = None
-
-                return {
-                    "title": corrected_title,
-                    "season": season_int,
-                    "episode": episode_int,
-                }
-            except Exception:
-                # Return dict with None values instead of None itself
-                # This ensures polars can always extract struct fields
-                return {
-                    "title": None,
-                    "season": None,
-                    "episode": None,
-                }
-
-        # Define struct schema for metadata extraction
-        metadata_schema = pl.Struct(
-            [
-                pl.Field("title", pl.Utf8),
-                pl.Field("season", pl.Int64),
-                pl.Field("episode", pl.Int64),
-            ]
+        # Apply title corrections to fix guessit parsing errors
+        torrents_for_matching = torrents_raw.with_columns(
+            pl.col("title").map_elements(apply_title_corrections, return_dtype=pl.Utf8)
         )
 
-        torrents_raw = torrents_raw.with_columns(
-            [
-                pl.col("guessit_data")
-                .map_elements(extract_metadata, return_dtype=metadata_schema)
-                .alias("metadata"),
-            ]
-        ).with_columns(
-            [
-                pl.col("metadata").struct.field("title").alias("title"),
-                pl.col("metadata").struct.field("season").alias("season"),
-                pl.col("metadata").struct.field("episode").alias("episode"),
-            ]
-        )
-
-        # Filter to valid titles
-        torrents_for_matching = torrents_raw.filter(pl.col("title").is_not_null())
-
         # Step 3: Fuzzy match torrent titles to AniList shows
         logger.info("\nStep 3: Fuzzy matching torrent titles to AniList shows...")
-        matcher = FuzzyMatcher(all_shows, threshold=fuzzy_threshold)
+        matcher = FuzzyMatcher(
+            all_shows, threshold=fuzzy_threshold, workers=match_workers
+        )
 
         # Prepare batch for matching (with season info)
         title_batch = [
@@ -391,6 +346,7 @@ async def run_etl_pipeline(
                 movie_shows,
                 threshold=fuzzy_threshold,
                 overrides=MOVIE_TITLE_OVERRIDES,
+                workers=match_workers,
             )
 
             # Use all torrents (not just episode-less ones)
@@ -490,6 +446,13 @@ def main():
         action="store_true",
         help="Use cached external ratings without refreshing Jikan or Niconico",
     )
+    parser.add_argument(
+        "--match-workers",
+        "-j",
+        type=int,
+        default=1,
+        help="Processes for fuzzy matching large torrent batches (default: 1)",
+    )
 
     args = parser.parse_args()
 
@@ -507,6 +470,7 @@ def main():
                 fuzzy_threshold=args.fuzzy_threshold,
                 use_mock_anilist=args.mock_anilist,
                 skip_external_ratings=args.skip_external_ratings,
+                match_workers=args.match_workers,
             )
         )
     except Exception:
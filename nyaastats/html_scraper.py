@@ -1,13 +1,16 @@
+import asyncio
 import json
 import logging
 import re
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 import guessit
 import httpx
-from bs4 import BeautifulSoup
 from guessit.jsonutils import GuessitEncoder
+from lxml import etree
+from lxml import html as lxml_html
 from whenever import Instant
 
 from .database import Database
@@ -15,6 +18,40 @@ from .models import TorrentData
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent page requests when fetching several browse pages
+MAX_CONCURRENT_PAGES = 8
+
+# Bytes per size unit, binary as Nyaa shows them and decimal
+_SIZE_UNITS = {
+    "TiB": 1024**4,
+    "GiB": 1024**3,
+    "MiB": 1024**2,
+    "KiB": 1024,
+    "TB": 1000**4,
+    "GB": 1000**3,
+    "MB": 1000**2,
+    "KB": 1000,
+    "B": 1,
+}
+
+# Compiled queries for the browse page's torrent table
+_TORRENT_TABLE = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' torrent-list ')]"
+)
+_TBODY = etree.XPath(".//tbody")
+_ROWS = etree.XPath(".//tr")
+_CELLS = etree.XPath(".//td")
+_LINKS = etree.XPath(".//a[@href]")
+_MAGNET_LINKS = etree.XPath(".//a[contains(@href, 'magnet:')]")
+# A view link's path, with the torrent's nyaa_id
+_VIEW_HREF_PATTERN = re.compile(r"/view/(\d+)")
+
+# The BitTorrent info hash in a magnet link's xt=urn:btih: parameter
+_INFOHASH_PATTERN = re.compile(r"[?&]xt=urn:btih:([^&#]+)")
+
+# A size like "1.2 GiB" or "309.2 MiB": the number, then one of _SIZE_UNITS
+_SIZE_PATTERN = re.compile(r"(\S+?)\s*(" + "|".join(_SIZE_UNITS) + r")")
+
 
 class HtmlScraper:
     """HTML scraper for Nyaa's browse page to support backfill functionality."""
@@ -26,29 +63,21 @@ class HtmlScraper:
         base_url: str = "https://nyaa.si",
         custom_url: str | None = None,
         now_func: Callable[[], Instant] = Instant.now,
+        parse_workers: int = 1,
     ):
         self.db = db
         self.client = client
         self.base_url = base_url
         self.custom_url = custom_url
         self.now_func = now_func
+        # Processes to parse pages in when fetching several at once
+        self.parse_workers = parse_workers
 
     def fetch_page(
         self, page: int = 1, category: str = "1_2", filter_type: str = "0"
     ) -> str:
         """Fetch HTML page from Nyaa browse endpoint or custom URL."""
-        if self.custom_url:
-            # Use custom URL with page parameter
-            url = self._build_paginated_url(self.custom_url, page)
-            params = None
-        else:
-            # Use default browse behavior
-            url = self.base_url
-            params = {
-                "c": category,
-                "f": filter_type,
-                "p": str(page),
-            }
+        url, params = self._page_request(page, category, filter_type)
 
         try:
             response = self.client.get(url, params=params)
@@ -58,6 +87,39 @@ class HtmlScraper:
             logger.error(f"Failed to fetch page {page}: {e}")
             raise
 
+    async def fetch_page_async(
+        self,
+        client: httpx.AsyncClient,
+        page: int = 1,
+        category: str = "1_2",
+        filter_type: str = "0",
+    ) -> str:
+        """Fetch HTML page with an async client."""
+        url, params = self._page_request(page, category, filter_type)
+
+        try:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            logger.error(f"Failed to fetch page {page}: {e}")
+            raise
+
+    def _page_request(
+        self, page: int, category: str = "1_2", filter_type: str = "0"
+    ) -> tuple[str, dict[str, str] | None]:
+        """Get the URL and query parameters to request a page."""
+        if self.custom_url:
+            # Use custom URL with page parameter
+            return self._build_paginated_url(self.custom_url, page), None
+
+        # Use default browse behavior
+        return self.base_url, {
+            "c": category,
+            "f": filter_type,
+            "p": str(page),
+        }
+
     def _build_paginated_url(self, base_url: str, page: int) -> str:
         """Build URL with page parameter for pagination."""
         parsed = urlparse(base_url)
@@ -79,26 +141,31 @@ class HtmlScraper:
             )
         )
 
-    def parse_html_page(self, html: str) -> list[TorrentData]:
+    @staticmethod
+    def parse_html_page(html: str) -> list[TorrentData]:
         """Parse HTML page and extract torrent data."""
-        soup = BeautifulSoup(html, "lxml")
+        try:
+            document = lxml_html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            # Empty documents, or text lxml won't parse as a string
+            document = None
 
         # Find the torrent table
-        table = soup.find("table", class_="torrent-list")
-        if not table:
+        tables = _TORRENT_TABLE(document) if document is not None else []
+        if not tables:
             logger.warning("No torrent table found in HTML")
             return []
 
-        tbody = table.find("tbody")
-        if not tbody:
+        tbodies = _TBODY(tables[0])
+        if not tbodies:
             logger.warning("No tbody found in torrent table")
             return []
 
         results = []
 
-        for row in tbody.find_all("tr"):
+        for row in _ROWS(tbodies[0]):
             try:
-                torrent_data = self._parse_table_row(row)
+                torrent_data = HtmlScraper._parse_table_row(row)
                 if torrent_data:
                     results.append(torrent_data)
             except Exception as e:
@@ -107,9 +174,10 @@ class HtmlScraper:
 
         return results
 
-    def _parse_table_row(self, row) -> TorrentData | None:
+    @staticmethod
+    def _parse_table_row(row) -> TorrentData | None:
         """Parse a single table row to extract torrent data."""
-        cells = row.find_all("td")
+        cells = _CELLS(row)
         if len(cells) < 8:
             logger.warning(f"Row has {len(cells)} cells, expected 8")
             return None
@@ -131,12 +199,16 @@ class HtmlScraper:
             view_link = None
 
             # Find all links with /view/\d+ pattern
-            all_view_links = name_cell.find_all("a", href=re.compile(r"/view/\d+"))
+            all_view_links = [
+                link
+                for link in _LINKS(name_cell)
+                if _VIEW_HREF_PATTERN.search(link.get("href"))
+            ]
 
             # Filter out comment links (those with #comments or class="comments")
             for link in all_view_links:
                 href = link.get("href", "")
-                classes = link.get("class", [])
+                classes = link.get("class", "").split()
 
                 # Skip if it's a comment link
                 if "#comments" in href or "comments" in classes:
@@ -146,25 +218,25 @@ class HtmlScraper:
                 view_link = link
                 break
 
-            if not view_link:
+            if view_link is None:
                 logger.warning("No view link found in name cell")
                 return None
 
-            filename = view_link.get("title") or view_link.get_text().strip()
-            nyaa_id = self._extract_nyaa_id(view_link["href"])
+            filename = view_link.get("title") or view_link.text_content().strip()
+            nyaa_id = HtmlScraper._extract_nyaa_id(view_link.get("href"))
 
             # Extract infohash from magnet link
             link_cell = cells[2]
-            magnet_link = link_cell.find("a", href=re.compile(r"magnet:"))
-            if not magnet_link:
+            magnet_links = _MAGNET_LINKS(link_cell)
+            if not magnet_links:
                 logger.warning("No magnet link found in link cell")
                 return None
 
-            infohash = self._extract_infohash(magnet_link["href"])
+            infohash = HtmlScraper._extract_infohash(magnet_links[0].get("href"))
 
             # Extract size
-            size_text = cells[3].get_text().strip()
-            size_bytes = self._parse_size(size_text)
+            size_text = cells[3].text_content().strip()
+            size_bytes = HtmlScraper._parse_size(size_text)
 
             # Extract date from data-timestamp attribute
             date_cell = cells[4]
@@ -176,13 +248,14 @@ class HtmlScraper:
             pubdate = Instant.from_timestamp(int(timestamp_str))
 
             # Extract seeders, leechers, downloads
-            seeders = int(cells[5].get_text().strip())
-            leechers = int(cells[6].get_text().strip())
-            downloads = int(cells[7].get_text().strip())
+            seeders = int(cells[5].text_content().strip())
+            leechers = int(cells[6].text_content().strip())
+            downloads = int(cells[7].text_content().strip())
 
             # Determine if torrent is trusted (check for success class)
-            trusted = "success" in row.get("class", [])
-            remake = "danger" in row.get("class", [])
+            row_classes = row.get("class", "").split()
+            trusted = "success" in row_classes
+            remake = "danger" in row_classes
 
             # Extract metadata with guessit
             guessit_data = None
@@ -219,50 +292,34 @@ class HtmlScraper:
             logger.warning(f"Failed to parse row data: {e}")
             return None
 
-    def _extract_nyaa_id(self, view_href: str) -> int:
+    @staticmethod
+    def _extract_nyaa_id(view_href: str) -> int:
         """Extract nyaa_id from view link href like '/view/1994237'."""
-        match = re.search(r"/view/(\d+)", view_href)
+        match = _VIEW_HREF_PATTERN.search(view_href)
         if not match:
             raise ValueError(f"Could not extract nyaa_id from: {view_href}")
         return int(match.group(1))
 
-    def _extract_infohash(self, magnet_url: str) -> str:
+    @staticmethod
+    def _extract_infohash(magnet_url: str) -> str:
         """Extract infohash from magnet link."""
-        parsed = urlparse(magnet_url)
-        query_params = parse_qs(parsed.query)
-
-        # Look for xt parameter with btih
-        xt_values = query_params.get("xt", [])
-        for xt in xt_values:
-            if xt.startswith("urn:btih:"):
-                return xt[9:]  # Remove "urn:btih:" prefix
-
-        raise ValueError(f"Could not extract infohash from magnet URL: {magnet_url}")
+        # Look for the first xt parameter with btih
+        match = _INFOHASH_PATTERN.search(magnet_url)
+        if not match:
+            raise ValueError(
+                f"Could not extract infohash from magnet URL: {magnet_url}"
+            )
+        return match.group(1)
 
-    def _parse_size(self, size_text: str) -> int:
+    @staticmethod
+    def _parse_size(size_text: str) -> int:
         """Parse size string like '1.2 GiB' or '309.2 MiB' to bytes."""
-        size_text = size_text.strip()
-
-        # Mapping of units to bytes
-        units = {
-            "TiB": 1024**4,
-            "GiB": 1024**3,
-            "MiB": 1024**2,
-            "KiB": 1024,
-            "TB": 1000**4,
-            "GB": 1000**3,
-            "MB": 1000**2,
-            "KB": 1000,
-            "B": 1,
-        }
-
-        # Find the unit in the string (check longest units first)
-        for unit, multiplier in units.items():
-            if size_text.endswith(unit):
-                size_value = float(size_text[: -len(unit)].strip())
-                return int(size_value * multiplier)
+        match = _SIZE_PATTERN.fullmatch(size_text.strip())
+        if not match:
+            raise ValueError(f"Could not parse size: {size_text}")
 
-        raise ValueError(f"Could not parse size: {size_text}")
+        size_value = float(match.group(1))
+        return int(size_value * _SIZE_UNITS[match.group(2)])
 
     def process_page(self, page: int = 1) -> int:
         """Process a single page and insert torrents into database."""
@@ -274,26 +331,76 @@ class HtmlScraper:
         # Parse torrents from HTML
         torrents = self.parse_html_page(html)
 
-        processed_count = 0
+        processed_count = self._insert_new_torrents(torrents)
+        logger.info(f"Processed {processed_count} new torrents from page {page}")
+        return processed_count
 
-        for torrent_data in torrents:
-            try:
-                # Check if torrent already exists
-                if self.db.get_torrent_exists(torrent_data.infohash):
-                    logger.debug(
-                        f"Torrent {torrent_data.infohash} already exists, skipping"
-                    )
-                    continue
+    async def process_pages_async(self, pages: list[int]) -> int:
+        """Fetch several pages concurrently and insert their torrents."""
+        logger.info(f"Processing pages {pages}")
+
+        # Mirror the sync client's configuration; the async client is scoped to
+        # this call because it is bound to the running event loop.
+        async with httpx.AsyncClient(
+            headers=self.client.headers,
+            timeout=self.client.timeout,
+            follow_redirects=self.client.follow_redirects,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_PAGES),
+        ) as client:
+            htmls = await asyncio.gather(
+                *(self.fetch_page_async(client, page) for page in pages),
+                return_exceptions=True,
+            )
 
-                # Insert torrent
-                self.db.insert_torrent(torrent_data)
-                processed_count += 1
+        # Failures were already logged by fetch_page_async; keep going with the
+        # other pages
+        htmls = [html for html in htmls if not isinstance(html, BaseException)]
 
-                logger.debug(f"Processed torrent: {torrent_data.filename}")
+        torrents = []
+        for page_torrents in self._parse_pages(htmls):
+            torrents.extend(page_torrents)
 
-            except Exception as e:
-                logger.error(f"Failed to process torrent {torrent_data.infohash}: {e}")
+        processed_count = self._insert_new_torrents(torrents)
+        logger.info(f"Processed {processed_count} new torrents from {len(pages)} pages")
+        return processed_count
+
+    def process_pages(self, pages: list[int]) -> int:
+        """Fetch several pages concurrently and insert their torrents."""
+        return asyncio.run(self.process_pages_async(pages))
+
+    def _parse_pages(self, htmls: list[str]) -> list[list[TorrentData]]:
+        """Parse pages, in a process pool if configured with parse_workers.
+
+        Parsing is mostly guessit, which is pure Python, so threads would
+        serialize on the GIL. Workers only parse; inserts stay in this process.
+        """
+        if self.parse_workers <= 1 or len(htmls) <= 1:
+            return [self.parse_html_page(html) for html in htmls]
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            return list(pool.map(HtmlScraper.parse_html_page, htmls))
+
+    def _insert_new_torrents(self, torrents: list[TorrentData]) -> int:
+        """Insert the torrents not stored yet, returning how many were new."""
+        # Look up which of the torrents are already stored in one query
+        known = self.db.get_known_torrents(
+            [torrent_data.infohash for torrent_data in torrents]
+        )
+
+        # Keyed by infohash, so a torrent listed twice is only inserted once
+        new_torrents: dict[str, TorrentData] = {}
+
+        for torrent_data in torrents:
+            # Check if torrent already exists
+            if torrent_data.infohash in known or torrent_data.infohash in new_torrents:
+                logger.debug(
+                    f"Torrent {torrent_data.infohash} already exists, skipping"
+                )
                 continue
 
-        logger.info(f"Processed {processed_count} new torrents from page {page}")
-        return processed_count
+            new_torrents[torrent_data.infohash] = torrent_data
+            logger.debug(f"Processed torrent: {torrent_data.filename}")
+
+        # Insert all new torrents in a single transaction
+        self.db.insert_torrents_bulk(list(new_torrents.values()))
+        return len(new_torrents)
@@ -1,5 +1,6 @@
 import logging
 import sys
+import time
 from collections.abc import Callable
 
 import httpx
@@ -7,7 +8,7 @@ from whenever import Instant, hours
 
 from .config import Settings
 from .database import Database
-from .rss_fetcher import RSSFetcher
+from .rss_fetcher import MAX_CONCURRENT_PAGES, RSSFetcher
 from .scheduler import Scheduler
 from .tracker import TrackerScraper
 
@@ -25,10 +26,15 @@ class NyaaTracker:
         self.db = Database(settings.db_path, now_func)
 
         # Create HTTP clients with proper configuration
+        # Reuse connections between requests; HTTP/2 is opt-in as it needs h2
         self.rss_client = httpx.Client(
-            timeout=30.0,
+            timeout=httpx.Timeout(30.0, connect=5.0),
             headers={"User-Agent": "nyaastats/1.0 RSS Fetcher"},
             follow_redirects=True,
+            http2=settings.rss_http2,
+            limits=httpx.Limits(
+                max_keepalive_connections=MAX_CONCURRENT_PAGES, keepalive_expiry=300
+            ),
         )
         self.tracker_client = httpx.Client(
             timeout=30.0,
@@ -36,12 +42,22 @@ class NyaaTracker:
         )
 
         self.rss_fetcher = RSSFetcher(
-            self.db, self.rss_client, settings.rss_url, now_func
+            self.db,
+            self.rss_client,
+            settings.rss_url,
+            now_func,
+            http2=settings.rss_http2,
+            guessit_workers=settings.guessit_workers,
         )
         self.tracker = TrackerScraper(
             self.db, self.tracker_client, settings.tracker_url, now_func
         )
-        self.scheduler = Scheduler(self.db, settings.scrape_batch_size, now_func)
+        self.scheduler = Scheduler(
+            self.db,
+            settings.scrape_batch_size,
+            now_func,
+            metrics_ttl=settings.metrics_ttl,
+        )
         self.rss_fetch_interval_hours = settings.rss_fetch_interval_hours
 
     def run(self) -> None:
@@ -61,7 +77,12 @@ class NyaaTracker:
             if self._should_fetch_rss():
                 logger.info("Fetching RSS feed")
                 try:
-                    processed = self.rss_fetcher.process_feed()
+                    if self.settings.rss_pages > 1:
+                        processed = self.rss_fetcher.process_pages(
+                            list(range(1, self.settings.rss_pages + 1))
+                        )
+                    else:
+                        processed = self.rss_fetcher.process_feed()
                     logger.info(f"RSS fetch completed, processed {processed} entries")
                 except Exception as e:
                     logger.error(f"RSS fetch failed: {e}")
@@ -80,38 +101,14 @@ class NyaaTracker:
                     f"Scraping {total_torrents} torrents in batches of {batch_size}"
                 )
 
-                # Process torrents in batches
-                total_processed = 0
-                for i in range(0, total_torrents, batch_size):
-                    batch = due_torrents[i : i + batch_size]
-                    batch_num = (i // batch_size) + 1
-                    total_batches = (total_torrents + batch_size - 1) // batch_size
-
-                    logger.info(
-                        f"Processing batch {batch_num}/{total_batches} ({len(batch)} torrents)"
-                    )
-
-                    try:
-                        # Scrape current batch
-                        results = self.tracker.scrape_batch(batch)
-                        # Update stats
-                        self.tracker.update_batch_stats(results)
-                        total_processed += len(results)
-                        logger.info(
-                            f"Batch {batch_num} completed, processed {len(results)} torrents"
-                        )
-
-                        # Add delay between batches to be nice to the tracker
-                        if (
-                            i + batch_size < total_torrents
-                        ):  # Don't sleep after the last batch
-                            import time
-
-                            time.sleep(2)  # 2 second delay between batches
-
-                    except Exception as e:
-                        logger.error(f"Scraping failed for batch {batch_num}: {e}")
-                        continue  # Continue with next batch
+                batches = [
+                    due_torrents[i : i + batch_size]
+                    for i in range(0, total_torrents, batch_size)
+                ]
+                if self.settings.scrape_concurrency > 1:
+                    total_processed = self._scrape_concurrently(batches)
+                else:
+                    total_processed = self._scrape_sequentially(batches)
 
                 logger.info(
                     f"All batches completed. Total processed: {total_processed}/{total_torrents} torrents"
@@ -130,13 +127,69 @@ class NyaaTracker:
 
         logger.info("Nyaa tracker run completed")
 
+    def _scrape_sequentially(self, batches: list[list[str]]) -> int:
+        """Scrape batches one at a time, pausing between them."""
+        total_processed = 0
+        total_batches = len(batches)
+        for batch_num, batch in enumerate(batches, 1):
+            logger.info(
+                f"Processing batch {batch_num}/{total_batches} ({len(batch)} torrents)"
+            )
+
+            try:
+                # Scrape current batch
+                results = self.tracker.scrape_batch(batch)
+                # Update stats
+                self.tracker.update_batch_stats(results)
+                total_processed += len(results)
+                logger.info(
+                    f"Batch {batch_num} completed, processed {len(results)} torrents"
+                )
+
+                # Add delay between batches to be nice to the tracker
+                if batch_num < total_batches:  # Don't sleep after the last batch
+                    time.sleep(2)  # 2 second delay between batches
+
+            except Exception as e:
+                logger.error(f"Scraping failed for batch {batch_num}: {e}")
+                continue  # Continue with next batch
+
+        return total_processed
+
+    def _scrape_concurrently(self, batches: list[list[str]]) -> int:
+        """Scrape batches with several tracker requests in flight at once."""
+        logger.info(
+            f"Scraping {len(batches)} batches, "
+            f"{self.settings.scrape_concurrency} at a time"
+        )
+        batch_results = self.tracker.scrape_batches(
+            batches, max_concurrent=self.settings.scrape_concurrency
+        )
+
+        total_processed = 0
+        for batch_num, results in enumerate(batch_results, 1):
+            try:
+                self.tracker.update_batch_stats(results)
+                total_processed += len(results)
+                logger.info(
+                    f"Batch {batch_num} completed, processed {len(results)} torrents"
+                )
+            except Exception as e:
+                logger.error(f"Updating stats failed for batch {batch_num}: {e}")
+                continue
+
+        return total_processed
+
     def print_stats(self) -> None:
         """Print current system metrics and schedule summary."""
         try:
-            metrics = self.scheduler.get_metrics()
+            # Evaluate both against the same instant so the schedule bounds
+            # are only computed once
+            now = self.now_func()
+            metrics = self.scheduler.get_metrics(now)
             logger.info(f"Metrics: {metrics}")
 
-            schedule_summary = self.scheduler.get_schedule_summary()
+            schedule_summary = self.scheduler.get_schedule_summary(now)
             logger.info(f"Schedule summary: {schedule_summary}")
         except Exception as e:
             logger.error(f"Failed to retrieve metrics: {e}")
@@ -167,6 +220,8 @@ class NyaaTracker:
 
     def status(self) -> dict:
         """Get current system status."""
+        now = self.now_func()
+
         # Get last RSS fetch time from database
         with self.db.get_conn() as conn:
             cursor = conn.execute("SELECT MAX(pubdate) as last_rss FROM torrents")
@@ -182,8 +237,8 @@ class NyaaTracker:
             ).format_common_iso()
             if last_rss_fetch
             else None,
-            "metrics": self.scheduler.get_metrics(),
-            "schedule_summary": self.scheduler.get_schedule_summary(),
+            "metrics": self.scheduler.get_metrics(now),
+            "schedule_summary": self.scheduler.get_schedule_summary(now),
         }
 
 
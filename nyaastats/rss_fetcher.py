@@ -1,12 +1,19 @@
-import json
+import asyncio
+import functools
+import hashlib
 import logging
+import re
+import time
 from collections.abc import Callable
-from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from email.utils import mktime_tz, parsedate_tz
+from typing import Any
 
-import feedparser
-import guessit
 import httpx
+from guessit.api import GuessItApi
 from guessit.jsonutils import GuessitEncoder
+from lxml import etree
 from whenever import Instant
 
 from .database import Database
@@ -14,6 +21,123 @@ from .models import TorrentData
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent page requests when fetching several feed pages
+MAX_CONCURRENT_PAGES = 10
+
+# Don't expand entities or touch the network while parsing untrusted feeds
+_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, recover=True)
+
+# Numeric last path segment of a view URL, e.g. https://nyaa.si/view/123456
+_NYAA_ID_RE = re.compile(r"/(\d+)(?:[?#]|$)")
+
+# Binary size prefixes in ascending order (K = 1024**1, M = 1024**2, ...)
+_SIZE_PREFIXES = "KMGT"
+
+# Shared guessit instance so the rebulk rules are only built once per process
+_guessit_api = GuessItApi()
+
+
+_guessit_encoder = GuessitEncoder()
+
+
+def _to_json_value(value: Any) -> Any:
+    """Convert a guessit value to plain JSON types.
+
+    Same conversions as GuessitEncoder (languages to strings, dates to ISO, ...)
+    without serializing to a string and parsing it back.
+    """
+    if value is None or isinstance(value, str | int | float):
+        return value
+    if isinstance(value, list | tuple):
+        return [_to_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_json_value(v) for k, v in value.items()}
+    return _to_json_value(_guessit_encoder.default(value))
+
+
+@functools.lru_cache(maxsize=4096)
+def _guess_cached(title: str) -> dict:
+    """Run guessit on a title and convert the result to plain JSON types."""
+    return _to_json_value(_guessit_api.guessit(title))
+
+
+def _guess_from_title(title: str) -> dict:
+    """Extract guessit metadata, memoized on the title.
+
+    Feeds repeat near-identical titles across pages. Callers get their own copy
+    of the cached dict; nested values are shared and must not be mutated.
+    """
+    return dict(_guess_cached(title))
+
+
+def _init_guessit_worker() -> None:
+    """Build guessit's rules once when a worker process starts."""
+    _guessit_api.configure({})
+
+
+def _guess_in_worker(title: str) -> dict | None:
+    """Run guessit in a worker process, returning None on failure."""
+    try:
+        return _guess_cached(title)
+    except Exception as e:
+        logger.warning(f"Guessit parsing failed for '{title}': {e}")
+        return None
+
+
+class FeedEntry(dict):
+    """RSS item fields, accessible as attributes (e.g. ``entry.nyaa_infohash``)."""
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+@dataclass
+class Feed:
+    """Parsed RSS feed."""
+
+    entries: list[FeedEntry] = field(default_factory=list)
+    # feed_cache row (url, etag, last_modified, body_hash) for the fetch this
+    # came from, stored once the entries have been processed
+    cache_entry: tuple[str, str | None, str | None, str] | None = None
+
+
+def parse_feed(content: bytes) -> Feed:
+    """Parse an RSS document into entries keyed like feedparser.
+
+    Namespaced elements are keyed by prefix and lowercased local name
+    (``<nyaa:infoHash>`` becomes ``nyaa_infohash``), and ``pubDate`` is exposed
+    as ``published`` plus a UTC ``published_parsed`` struct_time.
+    """
+    root = etree.fromstring(content, _XML_PARSER)
+    if root is None:
+        return Feed()
+
+    entries = []
+    for item in root.iter("item"):
+        entry = FeedEntry()
+        for child in item:
+            if not isinstance(child.tag, str):
+                # Skip comments and processing instructions
+                continue
+            name = etree.QName(child).localname.lower()
+            if child.prefix:
+                name = f"{child.prefix}_{name}"
+            entry[name] = (child.text or "").strip()
+
+        pubdate = entry.pop("pubdate", None)
+        if pubdate is not None:
+            entry["published"] = pubdate
+            parsed = parsedate_tz(pubdate)
+            entry["published_parsed"] = (
+                time.gmtime(mktime_tz(parsed)) if parsed else None
+            )
+        entries.append(entry)
+
+    return Feed(entries=entries)
+
 
 class RSSFetcher:
     def __init__(
@@ -22,57 +146,139 @@ class RSSFetcher:
         client: httpx.Client,
         feed_url: str = "https://nyaa.si/?page=rss&c=1_2&f=0",
         now_func: Callable[[], Instant] = Instant.now,
+        http2: bool = False,
+        guessit_workers: int = 1,
     ):
         self.db = db
         self.feed_url = feed_url
         self.client = client
         self.now_func = now_func
+        self.http2 = http2
+        self.guessit_workers = guessit_workers
+        # Build guessit's rules up front rather than on the first entry
+        _guessit_api.configure({})
 
-    def fetch_feed(self, page: int | None = None) -> feedparser.FeedParserDict:
-        """Fetch RSS feed, optionally with pagination."""
+    def _page_url(self, page: int | None = None) -> str:
+        """Build the feed URL, optionally with pagination."""
         url = self.feed_url
         if page:
             url += f"&p={page}"
+        return url
+
+    def _conditional_headers(self, cached: dict | None) -> dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers from the last fetch."""
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def _new_cache_entry(
+        self, url: str, cached: dict | None, response: httpx.Response
+    ) -> tuple[str, str | None, str | None, str] | None:
+        """Get the feed_cache row for a changed feed.
+
+        Returns None if the feed is unchanged since the last fetch: either a 304
+        response or a full response whose body is identical to the last one
+        (e.g. validators dropped by a redirect or proxy). Nothing is stored
+        here, so a feed whose entries fail to process is fetched in full again.
+        """
+        if response.status_code == 304:
+            logger.info(f"RSS feed not modified since last fetch: {url}")
+            return None
+        response.raise_for_status()
+
+        body_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if cached and cached["body_hash"] == body_hash:
+            logger.info(f"RSS feed body unchanged since last fetch: {url}")
+            return None
+
+        return (
+            url,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            body_hash,
+        )
+
+    def _store_cache_entries(self, feeds: list[Feed]) -> None:
+        """Remember the validators and body hash of feeds that were processed."""
+        for feed in feeds:
+            if feed.cache_entry is not None:
+                self.db.upsert_feed_cache(*feed.cache_entry)
+
+    def fetch_feed(self, page: int | None = None) -> Feed | None:
+        """Fetch RSS feed, optionally with pagination.
+
+        Returns None if the feed is unchanged since the last fetch.
+        """
+        url = self._page_url(page)
+        cached = self.db.get_feed_cache(url)
 
         try:
-            response = self.client.get(url)
-            response.raise_for_status()
-            return feedparser.parse(response.text)
+            response = self.client.get(url, headers=self._conditional_headers(cached))
+            cache_entry = self._new_cache_entry(url, cached, response)
+            if cache_entry is None:
+                return None
+            feed = parse_feed(response.content)
+            feed.cache_entry = cache_entry
+            return feed
         except Exception as e:
             logger.error(f"Failed to fetch RSS feed: {e}")
             raise
 
-    def parse_entry(self, entry: feedparser.FeedParserDict) -> TorrentData:
-        """Parse RSS entry into torrent data with guessit metadata."""
-        # Extract nyaa-specific fields from namespaced elements
-        infohash = getattr(entry, "nyaa_infohash", "")
-        if not infohash:
-            # Try alternative attribute names in case namespace handling varies
-            infohash = getattr(entry, "infohash", "")
+    async def fetch_feed_async(
+        self, client: httpx.AsyncClient, page: int | None = None
+    ) -> Feed | None:
+        """Fetch RSS feed with an async client, parsing off the event loop.
+
+        Returns None if the feed is unchanged since the last fetch.
+        """
+        url = self._page_url(page)
+        cached = self.db.get_feed_cache(url)
+
+        try:
+            response = await client.get(url, headers=self._conditional_headers(cached))
+            cache_entry = self._new_cache_entry(url, cached, response)
+            if cache_entry is None:
+                return None
+            feed = await asyncio.to_thread(parse_feed, response.content)
+            feed.cache_entry = cache_entry
+            return feed
+        except Exception as e:
+            logger.error(f"Failed to fetch RSS feed page {page}: {e}")
+            raise
+
+    def parse_entry(
+        self, entry: FeedEntry, guesses: dict[str, dict | None] | None = None
+    ) -> TorrentData:
+        """Parse RSS entry into torrent data with guessit metadata.
+
+        ``guesses`` holds guessit results already computed for some titles
+        (None where guessit failed); other titles are parsed here.
+        """
+        # Plain dict lookups avoid FeedEntry's exception-based attribute fallback
+        get = entry.get
+
+        infohash = self._entry_infohash(entry)
 
         # Parse GUID for nyaa ID
-        guid_url = urlparse(getattr(entry, "guid", ""))
-        nyaa_id = None
-        if guid_url.path:
-            try:
-                nyaa_id = int(guid_url.path.split("/")[-1])
-            except (ValueError, IndexError):
-                pass
+        match = _NYAA_ID_RE.search(get("guid", ""))
+        nyaa_id = int(match.group(1)) if match else None
 
         # Parse size (convert to bytes)
-        size_str = getattr(entry, "nyaa_size", "0 B")
-        if not size_str:
-            size_str = "0 B"
+        size_str = get("nyaa_size") or "0 B"
         size_bytes = self._parse_size(size_str)
 
         # Parse dates - handle both RSS date formats
-        pubdate_str = getattr(entry, "published", "")
+        pubdate_str = get("published", "")
         if pubdate_str:
             try:
-                # Use feedparser's built-in date parsing
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
+                # Use the date parsed from the RSS pubDate
+                parsed_time = get("published_parsed")
+                if parsed_time:
                     # published_parsed is a time.struct_time with at least 6 elements
-                    parsed_time = entry.published_parsed
                     if len(parsed_time) >= 6:
                         pubdate = Instant.from_utc(
                             parsed_time[0],
@@ -85,7 +291,7 @@ class RSSFetcher:
                     else:
                         pubdate = self.now_func()
                 else:
-                    # Fallback to manual parsing - feedparser should handle this
+                    # Unparseable pubDate
                     pubdate = self.now_func()
             except Exception as e:
                 logger.warning(f"Failed to parse pubdate '{pubdate_str}': {e}")
@@ -94,75 +300,155 @@ class RSSFetcher:
             pubdate = self.now_func()
 
         # Extract metadata with guessit
-        filename = getattr(entry, "title", "")
+        filename = get("title", "")
         guessit_data = None
-        if filename:
+        if guesses is not None and filename in guesses:
+            guessit_data = guesses[filename]
+        elif filename:
             try:
-                guessit_result = guessit.guessit(filename)
-                guessit_data = json.loads(
-                    json.dumps(guessit_result, cls=GuessitEncoder, ensure_ascii=False)
-                )
+                guessit_data = _guess_from_title(filename)
             except Exception as e:
                 logger.warning(f"Guessit parsing failed for '{filename}': {e}")
                 guessit_data = None
 
-        torrent_data = TorrentData(
-            infohash=infohash.lower(),
+        # Every field is already converted to its model type above, so skip
+        # pydantic's validation pass
+        torrent_data = TorrentData.model_construct(
+            infohash=infohash,
             filename=filename,
             pubdate=pubdate,
             size_bytes=size_bytes,
             nyaa_id=nyaa_id,
-            trusted=getattr(entry, "nyaa_trusted", "No") == "Yes",
-            remake=getattr(entry, "nyaa_remake", "No") == "Yes",
-            seeders=int(getattr(entry, "nyaa_seeders", "0")),
-            leechers=int(getattr(entry, "nyaa_leechers", "0")),
-            downloads=int(getattr(entry, "nyaa_downloads", "0")),
+            trusted=get("nyaa_trusted") == "Yes",
+            remake=get("nyaa_remake") == "Yes",
+            seeders=int(get("nyaa_seeders") or 0),
+            leechers=int(get("nyaa_leechers") or 0),
+            downloads=int(get("nyaa_downloads") or 0),
             guessit_data=guessit_data,
         )
 
-        # Mark as failed in database if guessit parsing failed and torrent exists
-        if not guessit_data and self.db.get_torrent_exists(torrent_data.infohash):
-            self.db.mark_torrent_status(torrent_data.infohash, "guessit_failed")
-
         return torrent_data
 
+    @staticmethod
+    def _entry_infohash(entry: FeedEntry) -> str:
+        """Get an entry's lowercased infohash from its namespaced element.
+
+        Falls back to the unprefixed name in case namespace handling varies.
+        """
+        return (entry.get("nyaa_infohash") or entry.get("infohash") or "").lower()
+
     def _parse_size(self, size_str: str) -> int:
-        """Convert size string to bytes."""
+        """Convert size string to bytes.
+
+        KB, MB, ... are treated as binary units, same as KiB, MiB, ...
+        """
         parts = size_str.split()
         if len(parts) != 2:
             return 0
 
         try:
             value = float(parts[0])
-            unit = parts[1].upper()
-        except (ValueError, IndexError):
+        except ValueError:
             return 0
 
-        multipliers = {
-            "B": 1,
-            "KB": 1024,
-            "KIB": 1024,
-            "MB": 1024**2,
-            "MIB": 1024**2,
-            "GB": 1024**3,
-            "GIB": 1024**3,
-            "TB": 1024**4,
-            "TIB": 1024**4,
-        }
-
-        multiplier = multipliers.get(unit, 0)
-        if multiplier == 0:
+        unit = parts[1]
+        if unit in ("B", "b"):
+            return int(value)
+
+        # Unit prefix selects the power of 1024; what follows must be B or iB
+        exp = _SIZE_PREFIXES.find(unit[0].upper()) + 1
+        if exp == 0 or unit[1:].upper() not in ("B", "IB"):
             return 0
-        return int(value * multiplier)
+        return int(value * (1 << (10 * exp)))
 
     def process_feed(self, page: int | None = None) -> int:
         """Fetch and process RSS feed entries."""
         feed = self.fetch_feed(page)
+        if feed is None:
+            return 0
 
-        processed = 0
-        for entry in feed.entries:
+        processed = self._process_entries(feed.entries)
+        self._store_cache_entries([feed])
+
+        logger.info(f"Processed {processed} torrents from RSS feed")
+        return processed
+
+    async def process_pages_async(self, pages: list[int]) -> int:
+        """Fetch several feed pages concurrently and process their entries."""
+        # Mirror the sync client's configuration; the async client is scoped to
+        # this call because it is bound to the running event loop.
+        async with httpx.AsyncClient(
+            headers=self.client.headers,
+            timeout=self.client.timeout,
+            follow_redirects=self.client.follow_redirects,
+            http2=self.http2,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_PAGES),
+        ) as client:
+            feeds = await asyncio.gather(
+                *(self.fetch_feed_async(client, page) for page in pages),
+                return_exceptions=True,
+            )
+
+        # Failures were already logged by fetch_feed_async and unchanged pages
+        # have nothing new; keep going with the other pages
+        fetched = [
+            feed
+            for feed in feeds
+            if feed is not None and not isinstance(feed, BaseException)
+        ]
+        processed = self._process_entries(
+            [entry for feed in fetched for entry in feed.entries]
+        )
+        self._store_cache_entries(fetched)
+
+        logger.info(f"Processed {processed} torrents from {len(pages)} RSS feed pages")
+        return processed
+
+    def process_pages(self, pages: list[int]) -> int:
+        """Fetch and process several feed pages concurrently."""
+        return asyncio.run(self.process_pages_async(pages))
+
+    def _guess_titles(self, titles: set[str]) -> dict[str, dict | None]:
+        """Run guessit over titles in a process pool.
+
+        guessit is pure Python, so threads would serialize on the GIL.
+        """
+        titles = sorted(titles)
+        with ProcessPoolExecutor(
+            max_workers=self.guessit_workers, initializer=_init_guessit_worker
+        ) as pool:
+            results = pool.map(_guess_in_worker, titles, chunksize=16)
+            return dict(zip(titles, results, strict=True))
+
+    def _process_entries(self, entries: list[FeedEntry]) -> int:
+        """Parse new feed entries and insert them into the database.
+
+        Returns the number of new torrents. Entries already stored are skipped
+        before parsing: their rows and initial stats would be ignored on insert.
+        So are repeats of an entry, e.g. when a torrent shifts between pages
+        fetched together.
+        """
+        known = self.db.get_known_torrents(
+            [self._entry_infohash(entry) for entry in entries]
+        )
+
+        # Keyed by infohash, so an entry listed twice is only parsed once
+        new_entries: dict[str, FeedEntry] = {}
+        for entry in entries:
+            infohash = self._entry_infohash(entry)
+            if infohash not in known and infohash not in new_entries:
+                new_entries[infohash] = entry
+        entries = list(new_entries.values())
+
+        guesses = None
+        if self.guessit_workers > 1 and len(entries) > 1:
+            titles = {entry.get("title", "") for entry in entries} - {""}
+            guesses = self._guess_titles(titles)
+
+        torrents = []
+        for entry in entries:
             try:
-                torrent_data = self.parse_entry(entry)
+                torrent_data = self.parse_entry(entry, guesses)
 
                 # Skip if we don't have essential data
                 if not torrent_data.infohash or not torrent_data.filename:
@@ -171,12 +457,19 @@ class RSSFetcher:
                     )
                     continue
 
-                self.db.insert_torrent(torrent_data)
-                processed += 1
+                torrents.append(torrent_data)
             except Exception as e:
                 logger.error(
                     f"Failed to process entry {entry.get('title', 'Unknown')}: {e}"
                 )
 
-        logger.info(f"Processed {processed} torrents from RSS feed")
-        return processed
+        # Mark torrents seen again whose guessit parsing failed when first stored;
+        # newly seen torrents are left active
+        self.db.mark_torrents_status(
+            [infohash for infohash, has_guessit in known.items() if not has_guessit],
+            "guessit_failed",
+        )
+
+        # Insert all parsed entries in a single transaction
+        self.db.insert_torrents_bulk(torrents)
+        return len(torrents)
@@ -1,4 +1,5 @@
 import logging
+import time
 from collections.abc import Callable
 from typing import Any
 
@@ -8,6 +9,21 @@ from .database import Database
 
 logger = logging.getLogger(__name__)
 
+# Time-decay tier of a v_scrape_schedule row, bound to _schedule_bounds values
+_SCHEDULE_TYPE = """
+    CASE
+        WHEN last_scrape IS NULL THEN 'never_scraped'
+        WHEN pubdate >= :age_2d THEN 'hourly'
+        WHEN pubdate >= :age_7d THEN 'every_4_hours'
+        WHEN pubdate >= :age_30d THEN 'daily'
+        WHEN pubdate >= :age_180d THEN 'weekly'
+        ELSE 'never'
+    END
+"""
+
+# A cached result and when it was computed (time.monotonic)
+_ResultCache = tuple[float, dict[str, int]]
+
 
 class Scheduler:
     def __init__(
@@ -15,215 +31,194 @@ class Scheduler:
         db: Database,
         batch_size: int = 40,
         now_func: Callable[[], Instant] = Instant.now,
+        metrics_ttl: float = 0.0,
     ):
         self.db = db
         self.batch_size = batch_size
         self.now_func = now_func
+        # Seconds get_metrics/get_schedule_summary results are reused for, so
+        # frequent polling doesn't rescan the tables; 0 (the default) disables
+        # caching. Within the TTL a result is reused whatever ``now`` is asked
+        # for, so it can be up to that many seconds stale.
+        self.metrics_ttl = metrics_ttl
+        self._metrics_cache: _ResultCache | None = None
+        self._summary_cache: _ResultCache | None = None
+        # Bounds from the last _schedule_bounds call, keyed by (now, window)
+        self._bounds_cache: tuple[Instant, int, dict[str, str]] | None = None
 
     def get_due_torrents(self) -> list[str]:
         """Get torrents that are due for scraping based on time-decay algorithm."""
         return self.get_due_torrents_with_window(0)
 
-    def get_due_torrents_with_window(self, window_minutes: int) -> list[str]:
-        """Get torrents that are due for scraping within a time window for batching."""
-        now = self.now_func()
-        now_julian = now.timestamp() / 86400.0 + 2440587.5  # Convert to julian day
-        window_days = window_minutes / (24 * 60)  # Convert minutes to days
+    def _schedule_bounds(self, now: Instant, window_minutes: int = 0) -> dict[str, str]:
+        """Precompute the timestamp bounds for the time-decay schedule.
+
+        Timestamps are stored as ISO strings, which sort chronologically, so the
+        age tiers become plain comparisons against these bounds (which can use
+        the pubdate index), and due checks a comparison against the stored
+        next_scrape_due. Methods called with the same ``now`` share one
+        computation.
+        """
+        if self._bounds_cache is not None:
+            cached_now, cached_window, bounds = self._bounds_cache
+            if cached_now == now and cached_window == window_minutes:
+                return bounds
+
+        start = now.round(mode="floor")
+        bounds = {
+            # Published on or after these is within 2/7/30/180 days
+            "age_2d": start.subtract(hours=2 * 24).format_common_iso(),
+            "age_7d": start.subtract(hours=7 * 24).format_common_iso(),
+            "age_30d": start.subtract(hours=30 * 24).format_common_iso(),
+            "age_180d": start.subtract(hours=180 * 24).format_common_iso(),
+            # Next scrape due on or before this is due now (or within the window)
+            "due_at": start.add(minutes=window_minutes).format_common_iso(),
+        }
+        self._bounds_cache = (now, window_minutes, bounds)
+        return bounds
+
+    def get_due_torrents_with_window(
+        self,
+        window_minutes: int,
+        now: Instant | None = None,
+        limit: int | None = None,
+    ) -> list[str]:
+        """Get torrents that are due for scraping within a time window for batching.
+
+        With ``limit``, only the most overdue torrents are returned and SQLite
+        stops producing rows once it has enough.
+        """
+        bounds = self._schedule_bounds(now or self.now_func(), window_minutes)
 
         with self.db.get_conn() as conn:
-            cursor = conn.execute(
+            cursor = self.db.tuple_cursor(conn).execute(
                 """
-                SELECT t.infohash
-                FROM torrents t
-                LEFT JOIN (
-                    SELECT infohash, MAX(timestamp) as last_scrape
-                    FROM stats
-                    GROUP BY infohash
-                ) s ON t.infohash = s.infohash
-                WHERE t.status = 'active'
-                  AND (
-                    s.last_scrape IS NULL
-                    OR
-                    CASE
-                      WHEN (:now - julianday(t.pubdate)) <= 2 THEN
-                        (:now - julianday(s.last_scrape) + :window) * 24 >= 1
-                      WHEN (:now - julianday(t.pubdate)) <= 7 THEN
-                        (:now - julianday(s.last_scrape) + :window) * 24 >= 4
-                      WHEN (:now - julianday(t.pubdate)) <= 30 THEN
-                        (:now - julianday(s.last_scrape) + :window) >= 1
-                      WHEN (:now - julianday(t.pubdate)) <= 180 THEN
-                        (:now - julianday(s.last_scrape) + :window) >= 7
-                      ELSE
-                        FALSE
-                    END
-                  )
-                ORDER BY s.last_scrape ASC NULLS FIRST
+                SELECT infohash
+                FROM torrents INDEXED BY idx_torrents_active_due
+                WHERE status = 'active' AND next_scrape_due <= :due_at
+                ORDER BY next_scrape_due
+                LIMIT :limit
                 """,
-                {
-                    "now": now_julian,
-                    "window": window_days,
-                },
+                # A negative LIMIT means no limit in SQLite
+                {"due_at": bounds["due_at"], "limit": -1 if limit is None else limit},
             )
 
-            return [row["infohash"] for row in cursor.fetchall()]
+            return [infohash for (infohash,) in cursor]
 
-    def get_metrics(self) -> dict[str, int]:
-        """Get current system metrics."""
-        now = self.now_func()
-        now_julian = now.timestamp() / 86400.0 + 2440587.5  # Convert to julian day
+    def _cached(self, cache: _ResultCache | None) -> dict[str, int] | None:
+        """Return a copy of a cached result if it is younger than the TTL."""
+        if cache is not None and time.monotonic() - cache[0] < self.metrics_ttl:
+            return dict(cache[1])
+        return None
 
-        with self.db.get_conn() as conn:
-            metrics = {}
+    def get_metrics(self, now: Instant | None = None) -> dict[str, int]:
+        """Get current system metrics, reusing recent results."""
+        cached = self._cached(self._metrics_cache)
+        if cached is not None:
+            return cached
 
-            # Total torrents
-            cursor = conn.execute("SELECT COUNT(*) as count FROM torrents")
-            metrics["torrents_total"] = cursor.fetchone()["count"]
+        now = now or self.now_func()
+        bounds = self._schedule_bounds(now)
 
-            # Active torrents
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM torrents WHERE status = 'active'"
-            )
-            metrics["torrents_active"] = cursor.fetchone()["count"]
-
-            # Dead torrents
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM torrents WHERE status = 'dead'"
-            )
-            metrics["torrents_dead"] = cursor.fetchone()["count"]
+        with self.db.get_conn() as conn:
+            metrics = {}
 
-            # Guessit failed torrents
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM torrents WHERE status = 'guessit_failed'"
-            )
-            metrics["torrents_guessit_failed"] = cursor.fetchone()["count"]
+            # Torrent counts by status in one pass over the status index
+            counts = {
+                row["status"]: row["count"]
+                for row in conn.execute(
+                    "SELECT status, COUNT(*) as count FROM torrents GROUP BY status"
+                )
+            }
+            metrics["torrents_total"] = sum(counts.values())
+            metrics["torrents_active"] = counts.get("active", 0)
+            metrics["torrents_dead"] = counts.get("dead", 0)
+            metrics["torrents_guessit_failed"] = counts.get("guessit_failed", 0)
 
             # Queue depth (torrents due for scraping)
             cursor = conn.execute(
                 """
                 SELECT COUNT(*) as count
-                FROM torrents t
-                LEFT JOIN (
-                    SELECT infohash, MAX(timestamp) as last_scrape
-                    FROM stats
-                    GROUP BY infohash
-                ) s ON t.infohash = s.infohash
-                WHERE t.status = 'active'
-                  AND (
-                    s.last_scrape IS NULL
-                    OR
-                    CASE
-                      WHEN (:now - julianday(t.pubdate)) <= 2 THEN
-                        (:now - julianday(s.last_scrape)) * 24 >= 1
-                      WHEN (:now - julianday(t.pubdate)) <= 7 THEN
-                        (:now - julianday(s.last_scrape)) * 24 >= 4
-                      WHEN (:now - julianday(t.pubdate)) <= 30 THEN
-                        (:now - julianday(s.last_scrape)) >= 1
-                      WHEN (:now - julianday(t.pubdate)) <= 180 THEN
-                        (:now - julianday(s.last_scrape)) >= 7
-                      ELSE
-                        FALSE
-                    END
-                  )
+                FROM torrents INDEXED BY idx_torrents_active_due
+                WHERE status = 'active' AND next_scrape_due <= :due_at
                 """,
-                {"now": now_julian},
+                {"due_at": bounds["due_at"]},
             )
             metrics["queue_depth"] = cursor.fetchone()["count"]
 
-            # Total stats entries
-            cursor = conn.execute("SELECT COUNT(*) as count FROM stats")
-            metrics["stats_total"] = cursor.fetchone()["count"]
-
-            # Recent stats (last 24 hours)
-            cursor = conn.execute(
+            # Total and recent (last 24 hours) stats entries
+            row = conn.execute(
                 """
-                SELECT COUNT(*) as count FROM stats
-                WHERE :now - julianday(timestamp) <= 1
+                SELECT
+                    COUNT(*) as total,
+                    COALESCE(SUM(timestamp >= :since), 0) as recent
+                FROM stats
                 """,
-                {"now": now_julian},
-            )
-            metrics["stats_recent"] = cursor.fetchone()["count"]
+                {"since": now.subtract(hours=24).format_common_iso()},
+            ).fetchone()
+            metrics["stats_total"] = row["total"]
+            metrics["stats_recent"] = row["recent"]
 
-            return metrics
+        self._metrics_cache = (time.monotonic(), metrics)
+        return dict(metrics)
 
-    def get_torrent_scrape_schedule(self, infohash: str) -> dict[str, Any] | None:
+    def get_torrent_scrape_schedule(
+        self, infohash: str, now: Instant | None = None
+    ) -> dict[str, Any] | None:
         """Get scrape schedule information for a specific torrent."""
-        now = self.now_func()
-        now_julian = now.timestamp() / 86400.0 + 2440587.5  # Convert to julian day
+        now = now or self.now_func()
 
         with self.db.get_conn() as conn:
             cursor = conn.execute(
-                """
+                f"""
                 SELECT
-                    t.infohash,
-                    t.pubdate,
-                    t.status,
-                    s.last_scrape,
-                    :now - julianday(t.pubdate) as age_days,
-                    CASE
-                        WHEN s.last_scrape IS NULL THEN 'never_scraped'
-                        WHEN (:now - julianday(t.pubdate)) <= 2 THEN 'hourly'
-                        WHEN (:now - julianday(t.pubdate)) <= 7 THEN 'every_4_hours'
-                        WHEN (:now - julianday(t.pubdate)) <= 30 THEN 'daily'
-                        WHEN (:now - julianday(t.pubdate)) <= 180 THEN 'weekly'
-                        ELSE 'never'
-                    END as schedule_type,
-                    CASE
-                        WHEN s.last_scrape IS NULL THEN 1
-                        WHEN (:now - julianday(t.pubdate)) <= 2 THEN
-                            (:now - julianday(s.last_scrape)) * 24 >= 1
-                        WHEN (:now - julianday(t.pubdate)) <= 7 THEN
-                            (:now - julianday(s.last_scrape)) * 24 >= 4
-                        WHEN (:now - julianday(t.pubdate)) <= 30 THEN
-                            (:now - julianday(s.last_scrape)) >= 1
-                        WHEN (:now - julianday(t.pubdate)) <= 180 THEN
-                            (:now - julianday(s.last_scrape)) >= 7
-                        ELSE
-                            0
-                    END as is_due
-                FROM torrents t
-                LEFT JOIN (
-                    SELECT infohash, MAX(timestamp) as last_scrape
-                    FROM stats
-                    GROUP BY infohash
-                ) s ON t.infohash = s.infohash
-                WHERE t.infohash = :infohash
+                    infohash,
+                    pubdate,
+                    status,
+                    last_scrape,
+                    next_scrape_due,
+                    {_SCHEDULE_TYPE} as schedule_type,
+                    COALESCE(next_scrape_due <= :due_at, 0) as is_due
+                FROM v_scrape_schedule
+                WHERE infohash = :infohash
                 """,
-                {"now": now_julian, "infohash": infohash},
+                {**self._schedule_bounds(now), "infohash": infohash},
             )
 
             row = cursor.fetchone()
             if row:
-                return dict(row)
+                schedule = dict(row)
+                age = now - Instant.parse_common_iso(schedule["pubdate"])
+                schedule["age_days"] = age.in_hours() / 24
+                return schedule
             return None
 
-    def get_schedule_summary(self) -> dict[str, int]:
-        """Get summary of torrents by schedule type."""
-        now = self.now_func()
-        now_julian = now.timestamp() / 86400.0 + 2440587.5  # Convert to julian day
+    def get_schedule_summary(self, now: Instant | None = None) -> dict[str, int]:
+        """Get summary of torrents by schedule type, reusing recent results."""
+        cached = self._cached(self._summary_cache)
+        if cached is not None:
+            return cached
+
+        bounds = self._schedule_bounds(now or self.now_func())
 
         with self.db.get_conn() as conn:
             cursor = conn.execute(
-                """
-                SELECT
-                    CASE
-                        WHEN t.status != 'active' THEN t.status
-                        WHEN s.last_scrape IS NULL THEN 'never_scraped'
-                        WHEN (:now - julianday(t.pubdate)) <= 2 THEN 'hourly'
-                        WHEN (:now - julianday(t.pubdate)) <= 7 THEN 'every_4_hours'
-                        WHEN (:now - julianday(t.pubdate)) <= 30 THEN 'daily'
-                        WHEN (:now - julianday(t.pubdate)) <= 180 THEN 'weekly'
-                        ELSE 'never'
-                    END as schedule_type,
-                    COUNT(*) as count
-                FROM torrents t
-                LEFT JOIN (
-                    SELECT infohash, MAX(timestamp) as last_scrape
-                    FROM stats
-                    GROUP BY infohash
-                ) s ON t.infohash = s.infohash
+                f"""
+                -- Inactive torrents are counted by status alone, without the join
+                SELECT status as schedule_type, COUNT(*) as count
+                FROM torrents
+                WHERE status != 'active'
+                GROUP BY status
+                UNION ALL
+                SELECT {_SCHEDULE_TYPE} as schedule_type, COUNT(*) as count
+                FROM v_scrape_schedule
+                WHERE status = 'active'
                 GROUP BY schedule_type
                 """,
-                {"now": now_julian},
+                bounds,
             )
 
-            return {row["schedule_type"]: row["count"] for row in cursor.fetchall()}
+            summary = {row["schedule_type"]: row["count"] for row in cursor.fetchall()}
+
+        self._summary_cache = (time.monotonic(), summary)
+        return dict(summary)
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import Callable
 
@@ -10,6 +11,20 @@ from .models import StatsData
 
 logger = logging.getLogger(__name__)
 
+try:
+    # Optional Cython decoder (bencoder.pyx); same output as bencodepy, faster
+    from bencoder import bdecode as _fast_bdecode
+except ImportError:
+    _fast_bdecode = None
+
+# Upper bound on scrape requests in flight at once
+MAX_CONCURRENT_SCRAPES = 8
+
+
+def _is_zero(stats: StatsData) -> bool:
+    """Check if a scrape reported no seeders, leechers or downloads."""
+    return not (stats.seeders or stats.leechers or stats.downloads)
+
 
 class TrackerScraper:
     def __init__(
@@ -24,11 +39,11 @@ class TrackerScraper:
         self.client = client
         self.now_func = now_func
 
-    def scrape_batch(self, infohashes: list[str]) -> dict[str, StatsData]:
-        """Scrape a batch of infohashes from the tracker."""
-        if not infohashes:
-            return {}
+    def _scrape_url(self, infohashes: list[str]) -> tuple[str | None, list[str]]:
+        """Build the scrape URL for a batch.
 
+        Returns the URL (None if no infohash is valid) and the valid infohashes.
+        """
         # Build query string with URL-encoded infohashes
         params = []
         valid_infohashes = []
@@ -36,14 +51,11 @@ class TrackerScraper:
             try:
                 # Validate infohash format (must be a valid hex string)
                 # This also indirectly checks if it has an even number of characters
-                bytes.fromhex(infohash)
+                raw = bytes.fromhex(infohash)
 
                 # Manual URI encoding: uppercase each hex octet and prepend with '%'
                 # Example: "abcdef01" becomes "%AB%CD%EF%01"
-                encoded = "".join(
-                    f"%{infohash[i : i + 2].upper()}"
-                    for i in range(0, len(infohash), 2)
-                )
+                encoded = "%" + raw.hex("%").upper()
 
                 params.append(f"info_hash={encoded}")
                 valid_infohashes.append(infohash)
@@ -52,43 +64,113 @@ class TrackerScraper:
                 continue
 
         if not params:
-            return {}
+            return None, []
 
         query_string = "&".join(params)
-        url = f"{self.tracker_url}?{query_string}"
+        return f"{self.tracker_url}?{query_string}", valid_infohashes
+
+    def _parse_scrape(
+        self, content: bytes, valid_infohashes: list[str]
+    ) -> dict[str, StatsData]:
+        """Decode a bencoded scrape response into stats per infohash."""
+        # Decode bencode response, with the Cython decoder when it is installed
+        data = (_fast_bdecode or bencodepy.decode)(content)
+
+        results = {}
+        # bencodepy.decode returns a dict, so this is safe
+        files = data.get(b"files", {}) if isinstance(data, dict) else {}
+
+        for info_hash_bytes, stats in files.items():
+            infohash = info_hash_bytes.hex()
+            results[infohash] = StatsData(
+                seeders=stats.get(b"complete", 0),
+                leechers=stats.get(b"incomplete", 0),
+                downloads=stats.get(b"downloaded", 0),
+            )
+
+        # Fill in zeros for any missing valid infohashes
+        for infohash in valid_infohashes:
+            if infohash not in results:
+                results[infohash] = StatsData(seeders=0, leechers=0, downloads=0)
+
+        return results
+
+    def scrape_batch(self, infohashes: list[str]) -> dict[str, StatsData]:
+        """Scrape a batch of infohashes from the tracker."""
+        if not infohashes:
+            return {}
+
+        url, valid_infohashes = self._scrape_url(infohashes)
+        if url is None:
+            return {}
 
         try:
             response = self.client.get(url)
             response.raise_for_status()
+            return self._parse_scrape(response.content, valid_infohashes)
 
-            # Decode bencode response
-            data = bencodepy.decode(response.content)
-
-            results = {}
-            # bencodepy.decode returns a dict, so this is safe
-            files = data.get(b"files", {}) if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.error(f"Tracker scrape failed: {e}")
+            # Don't return any data for HTTP errors - network failures shouldn't count
+            # as individual torrent failures for dead torrent detection
+            return {}
 
-            for info_hash_bytes, stats in files.items():
-                infohash = info_hash_bytes.hex()
-                results[infohash] = StatsData(
-                    seeders=stats.get(b"complete", 0),
-                    leechers=stats.get(b"incomplete", 0),
-                    downloads=stats.get(b"downloaded", 0),
-                )
+    async def scrape_batch_async(
+        self, client: httpx.AsyncClient, infohashes: list[str]
+    ) -> dict[str, StatsData]:
+        """Scrape a batch of infohashes from the tracker with an async client."""
+        if not infohashes:
+            return {}
 
-            # Fill in zeros for any missing valid infohashes
-            for infohash in valid_infohashes:
-                if infohash not in results:
-                    results[infohash] = StatsData(seeders=0, leechers=0, downloads=0)
+        url, valid_infohashes = self._scrape_url(infohashes)
+        if url is None:
+            return {}
 
-            return results
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return self._parse_scrape(response.content, valid_infohashes)
 
         except Exception as e:
             logger.error(f"Tracker scrape failed: {e}")
-            # Don't return any data for HTTP errors - network failures shouldn't count
-            # as individual torrent failures for dead torrent detection
+            # Same as scrape_batch: a failed request yields no stats at all
             return {}
 
+    async def scrape_batches_async(
+        self,
+        batches: list[list[str]],
+        max_concurrent: int = MAX_CONCURRENT_SCRAPES,
+    ) -> list[dict[str, StatsData]]:
+        """Scrape several batches concurrently, at most max_concurrent at a time.
+
+        Results are returned in the same order as the batches.
+        """
+        # Bound in-flight requests to stay friendly to the tracker
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def scrape(
+            client: httpx.AsyncClient, batch: list[str]
+        ) -> dict[str, StatsData]:
+            async with semaphore:
+                return await self.scrape_batch_async(client, batch)
+
+        # Mirror the sync client's configuration; the async client is scoped to
+        # this call because it is bound to the running event loop.
+        async with httpx.AsyncClient(
+            headers=self.client.headers,
+            timeout=self.client.timeout,
+            limits=httpx.Limits(max_connections=max_concurrent),
+        ) as client:
+            return await asyncio.gather(*(scrape(client, batch) for batch in batches))
+
+    def scrape_batches(
+        self,
+        batches: list[list[str]],
+        max_concurrent: int = MAX_CONCURRENT_SCRAPES,
+    ) -> list[dict[str, StatsData]]:
+        """Scrape several batches concurrently."""
+        return asyncio.run(self.scrape_batches_async(batches, max_concurrent))
+
     def update_stats(
         self, infohash: str, stats: StatsData, timestamp: Instant | None = None
     ) -> None:
@@ -99,23 +181,14 @@ class TrackerScraper:
         # Insert the stats
         self.db.insert_stats(infohash, stats, timestamp)
 
-        # Check if torrent should be marked dead
-        if self._should_mark_dead(infohash):
+        # Check if torrent should be marked dead; only a zero scrape can make it so
+        if _is_zero(stats) and self._should_mark_dead(infohash):
             self.db.mark_torrent_status(infohash, "dead")
             logger.info(f"Marked torrent {infohash} as dead")
 
     def _should_mark_dead(self, infohash: str) -> bool:
         """Check if torrent has 3 consecutive zero responses."""
-        recent_stats = self.db.get_recent_stats(infohash, limit=3)
-
-        if len(recent_stats) < 3:
-            return False
-
-        # Check if all 3 recent scrapes returned zeros
-        return all(
-            row["seeders"] == 0 and row["leechers"] == 0 and row["downloads"] == 0
-            for row in recent_stats
-        )
+        return bool(self.db.get_dead_torrents([infohash], scrapes=3))
 
     def update_batch_stats(self, results: dict[str, StatsData]) -> None:
         """Update stats for a batch of torrents."""
@@ -123,9 +196,14 @@ class TrackerScraper:
             logger.warning("No tracker results to update (possible network error)")
             return
 
-        updated_count = 0
-        for infohash, stats in results.items():
-            self.update_stats(infohash, stats)
-            updated_count += 1
+        self.db.insert_stats_bulk(results, self.now_func().round())
+
+        # Check the whole batch for dead torrents at once; only torrents whose
+        # latest scrape was all zeros can have just died
+        zero = [infohash for infohash, stats in results.items() if _is_zero(stats)]
+        dead = self.db.get_dead_torrents(zero, scrapes=3)
+        self.db.mark_torrents_status(dead, "dead")
+        for infohash in dead:
+            logger.info(f"Marked torrent {infohash} as dead")
 
-        logger.info(f"Updated stats for {updated_count} torrents")
+        logger.info(f"Updated stats for {len(results)} torrents")
@@ -34,14 +34,13 @@ query ($search: String) {
 """
 
 
-def search_anime(title: str) -> list[dict]:
-    with httpx.Client() as client:
-        resp = client.post(
-            ANILIST_API_URL,
-            json={"query": SEARCH_QUERY, "variables": {"search": title}},
-        )
-        resp.raise_for_status()
-        return resp.json()["data"]["Page"]["media"]
+def search_anime(client: httpx.Client, title: str) -> list[dict]:
+    resp = client.post(
+        ANILIST_API_URL,
+        json={"query": SEARCH_QUERY, "variables": {"search": title}},
+    )
+    resp.raise_for_status()
+    return resp.json()["data"]["Page"]["media"]
 
 
 def main():
@@ -49,25 +48,27 @@ def main():
     parser.add_argument("titles", nargs="+", help="Anime titles to search for")
     args = parser.parse_args()
 
-    for title in args.titles:
-        print(f"\n{'=' * 60}")
-        print(f"Search: {title}")
-        print("=" * 60)
-        results = search_anime(title)
-        if not results:
-            print("  No results found")
-            continue
-        for r in results:
-            romaji = r["title"]["romaji"]
-            english = r["title"].get("english") or ""
-            fmt = r.get("format") or "?"
-            status = r.get("status") or "?"
-            eps = r.get("episodes") or "?"
-            year = r.get("seasonYear") or r.get("startDate", {}).get("year") or "?"
-            season = r.get("season") or ""
-            eng_str = f" / {english}" if english and english != romaji else ""
-            print(f"  ID: {r['id']:>8}  {romaji}{eng_str}")
-            print(f"           {fmt} | {status} | {eps} eps | {season} {year}")
+    # One client for all titles, so the connection is set up once
+    with httpx.Client() as client:
+        for title in args.titles:
+            print(f"\n{'=' * 60}")
+            print(f"Search: {title}")
+            print("=" * 60)
+            results = search_anime(client, title)
+            if not results:
+                print("  No results found")
+                continue
+            for r in results:
+                romaji = r["title"]["romaji"]
+                english = r["title"].get("english") or ""
+                fmt = r.get("format") or "?"
+                status = r.get("status") or "?"
+                eps = r.get("episodes") or "?"
+                year = r.get("seasonYear") or r.get("startDate", {}).get("year") or "?"
+                season = r.get("season") or ""
+                eng_str = f" / {english}" if english and english != romaji else ""
+                print(f"  ID: {r['id']:>8}  {romaji}{eng_str}")
+                print(f"           {fmt} | {status} | {eps} eps | {season} {year}")
 
 
 if __name__ == "__main__":
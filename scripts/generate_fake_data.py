@@ -10,6 +10,11 @@ import argparse
 import hashlib
 import random
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from itertools import accumulate
 from pathlib import Path
 
 # Add parent directory to path to import nyaastats modules
@@ -17,8 +22,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from whenever import Instant
 
-from nyaastats.database import Database
-from nyaastats.models import TorrentData
+from nyaastats.database import Database, TorrentRow
 
 # Realistic anime titles for test data
 FALL_2025_SHOWS = [
@@ -60,6 +64,23 @@ WINTER_2026_SHOWS = [
 RELEASE_GROUPS = ["SubsPlease", "Erai-raws", "Judas", "Tsundere-Raws", "HorribleSubs"]
 RESOLUTIONS = ["1080p", "720p", "480p"]
 
+# Seed used unless another is given, so every build is reproducible by default
+DEFAULT_SEED = 0xC0FFEE
+
+# Guessit fields shared by every fake release
+GUESSIT_TEMPLATE = {
+    "type": "episode",
+    "source": "Web",
+    "video_codec": "H.264",
+    "audio_codec": "AAC",
+    "container": "mkv",
+}
+
+INSERT_STATS_SQL = """
+    INSERT OR REPLACE INTO stats (infohash, timestamp, seeders, leechers, downloads)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
 # Season date ranges
 FALL_2025_START = Instant.from_utc(2025, 10, 1)
 FALL_2025_END = Instant.from_utc(2025, 12, 25)
@@ -77,7 +98,8 @@ def generate_infohash(
 ) -> str:
     """Generate a deterministic fake infohash."""
     content = f"{normalize_title_for_hash(show_title)}_{episode}_{group}_{resolution}"
-    return hashlib.sha1(content.encode()).hexdigest()
+    # Only needs to be stable and 40 hex chars like a real SHA-1 infohash
+    return hashlib.blake2b(content.encode(), digest_size=20).hexdigest()
 
 
 def generate_filename(
@@ -88,10 +110,8 @@ def generate_filename(
     return f"[{group}] {show_title} - {episode:02d} [{resolution}].mkv"
 
 
-def generate_guessit_data(
-    show_title: str, episode: int, group: str, resolution: str
-) -> dict:
-    """Generate realistic guessit metadata."""
+def split_show_title(show_title: str) -> tuple[str, int]:
+    """Split a show title into its base title and season number."""
     # Split title into base title and season if present
     title_parts = show_title.rsplit(" S", 1)
     base_title = title_parts[0]
@@ -105,69 +125,115 @@ def generate_guessit_data(
             # If season extraction fails, default to 1
             season = 1
 
+    return base_title, season
+
+
+def generate_guessit_data(
+    base_title: str, season: int, episode: int, group: str, resolution: str
+) -> dict:
+    """Generate realistic guessit metadata."""
     return {
+        **GUESSIT_TEMPLATE,
         "title": base_title,
         "episode": episode,
         "season": season,
         "release_group": group,
         "screen_size": resolution,
-        "type": "episode",
-        "source": "Web",
-        "video_codec": "H.264",
-        "audio_codec": "AAC",
-        "container": "mkv",
     }
 
 
-def generate_download_curve(
+def format_timestamp(seconds: int) -> str:
+    """Format epoch seconds like Database stores Instants."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+@cache
+def download_rate_factor(hours_since_release: int) -> float:
+    """Share of peak downloads per 24 hours at a given age of a release.
+
+    Every curve samples the same ages, so this is cached as a lookup table.
+    """
+    # Exponential decay: high downloads in first 24h, then tapering
+    # Peak in first 12 hours, then decay with half-life of ~48 hours
+    if hours_since_release < 12:
+        return 0.4  # 40% in first 12h
+    if hours_since_release < 24:
+        return 0.2  # 20% in next 12h
+    if hours_since_release < 72:
+        return 0.15  # 15% in next 48h
+    # Exponential decay after 72h
+    return 0.05 * 0.96 ** ((hours_since_release - 72) / 24)
+
+
+def generate_stats_curve(
+    rng: random.Random,
     first_timestamp: Instant,
     end_timestamp: Instant,
     peak_downloads: int,
     sample_interval_hours: int = 24,
-) -> list[tuple[Instant, int]]:
-    """Generate realistic download curve with exponential decay.
+) -> list[tuple[str, int, int, int]]:
+    """Generate realistic stats curve with exponential decay.
 
-    Downloads spike at release and decay exponentially over time.
-    Returns list of (timestamp, cumulative_downloads) tuples.
+    Downloads spike at release and decay exponentially over time, and seeders
+    and leechers decay with them. Returns list of
+    (timestamp, seeders, leechers, cumulative_downloads) tuples.
     """
-    curve = []
-    current_time = first_timestamp
-    cumulative_downloads = 0
-
-    # Time since release in hours
-    hours_since_release = 0
-
-    while current_time <= end_timestamp:
-        # Exponential decay: high downloads in first 24h, then tapering
-        # Peak in first 12 hours, then decay with half-life of ~48 hours
-        if hours_since_release < 12:
-            downloads_rate = peak_downloads * 0.4  # 40% in first 12h
-        elif hours_since_release < 24:
-            downloads_rate = peak_downloads * 0.2  # 20% in next 12h
-        elif hours_since_release < 72:
-            downloads_rate = peak_downloads * 0.15  # 15% in next 48h
-        else:
-            # Exponential decay after 72h
-            decay_factor = 0.96 ** ((hours_since_release - 72) / 24)
-            downloads_rate = peak_downloads * 0.05 * decay_factor
-
-        # Convert rate to downloads in this interval
-        interval_downloads = int(downloads_rate * (sample_interval_hours / 24))
-        interval_downloads = max(
-            0, int(random.gauss(interval_downloads, interval_downloads * 0.1))
+    # Sample offsets from release, up to and including end_timestamp. Offsets
+    # are plain epoch seconds, so no Instant is built per sample
+    first_seconds = first_timestamp.timestamp()
+    total_hours = (end_timestamp.timestamp() - first_seconds) // 3600
+    hours = range(0, total_hours + 1, sample_interval_hours)
+
+    # Bound once, since these are drawn several times per sample
+    gauss = rng.gauss
+    randint = rng.randint
+
+    # Convert rates to downloads per interval, with ~10% noise
+    interval_downloads = [
+        int(peak_downloads * download_rate_factor(h) * (sample_interval_hours / 24))
+        for h in hours
+    ]
+    noisy_downloads = [max(0, int(gauss(d, d * 0.1))) for d in interval_downloads]
+
+    # Seeders and leechers decay over time too
+    peers = [
+        (
+            max(5, int(500 * (0.95 ** (h / 24))) + randint(-10, 10)),
+            max(0, int(50 * (0.90 ** (h / 24))) + randint(-5, 5)),
         )
+        for h in hours
+    ]
+
+    timestamps = [format_timestamp(first_seconds + h * 3600) for h in hours]
+    return [
+        (timestamp, seeders, leechers, cumulative_downloads)
+        for timestamp, (seeders, leechers), cumulative_downloads in zip(
+            timestamps, peers, accumulate(noisy_downloads), strict=True
+        )
+    ]
 
-        cumulative_downloads += interval_downloads
-        curve.append((current_time, cumulative_downloads))
-
-        current_time = current_time.add(hours=sample_interval_hours)
-        hours_since_release += sample_interval_hours
 
-    return curve
+def generate_versions(
+    rng: random.Random, num_episodes: int, quick: bool = False
+) -> list[tuple[int, str, str]]:
+    """Pick the (episode, group, resolution) releases of a show."""
+    versions = []
+    for episode in range(1, num_episodes + 1):
+        # Generate multiple versions (different groups/resolutions)
+        # In quick mode, generate fewer versions per episode for speed
+        num_groups = 1 if quick else rng.randint(2, 3)
+        num_resolutions = 1 if quick else rng.randint(1, 2)
+        versions.extend(
+            (episode, group, resolution)
+            for group in rng.sample(RELEASE_GROUPS, k=num_groups)
+            for resolution in rng.sample(RESOLUTIONS, k=num_resolutions)
+        )
+    return versions
 
 
 def generate_show_data(
     db: Database,
+    rng: random.Random,
     show_title: str,
     num_episodes: int,
     air_start_date: Instant,
@@ -179,6 +245,7 @@ def generate_show_data(
 
     Args:
         db: Database instance
+        rng: Random number generator shared by the whole run
         show_title: Show title
         num_episodes: Total number of episodes
         air_start_date: When first episode airs
@@ -192,142 +259,199 @@ def generate_show_data(
     else:
         # For ongoing shows, only generate episodes up to current date
         # Assume weekly airing (7 days between episodes)
-        weeks_since_start = (WINTER_2026_NOW - air_start_date).in_seconds() / (
-            7 * 86400
-        )
+        weeks_since_start = (
+            WINTER_2026_NOW.timestamp() - air_start_date.timestamp()
+        ) / (7 * 86400)
         episodes_to_generate = min(num_episodes, int(weeks_since_start) + 1)
 
-    # Generate torrents for each episode with multiple versions
-    for episode in range(1, episodes_to_generate + 1):
-        # Episode air date (weekly releases)
+    # Determine end date for download tracking
+    if is_complete:
+        # Complete show: track downloads until season end + 4 weeks
+        tracking_end_date = season_end_date.add(hours=28 * 24)
+    else:
+        # Ongoing show: track until current date
+        tracking_end_date = WINTER_2026_NOW
+
+    base_title, season = split_show_title(show_title)
+
+    # Collect the whole show, then write it in two bulk transactions
+    torrent_rows: list[TorrentRow] = []
+    stats_rows: list[tuple[str, str, int, int, int]] = []
+
+    # Generate torrents for each version of each episode in one flat pass
+    for episode, group, resolution in generate_versions(
+        rng, episodes_to_generate, quick
+    ):
+        infohash = generate_infohash(show_title, episode, group, resolution)
+        filename = generate_filename(show_title, episode, group, resolution)
+        guessit_data = generate_guessit_data(
+            base_title, season, episode, group, resolution
+        )
+
+        # Episode air date (weekly releases), and the torrent appears 2-6
+        # hours after the episode airs (fansub delay)
         episode_air_date = air_start_date.add(hours=(episode - 1) * 7 * 24)
+        torrent_pubdate = episode_air_date.add(hours=rng.randint(2, 6))
+
+        # Skip future torrents
+        if torrent_pubdate > WINTER_2026_NOW:
+            continue
 
-        # Determine end date for this episode's download tracking
-        if is_complete:
-            # Complete show: track downloads until season end + 4 weeks
-            episode_end_date = season_end_date.add(hours=28 * 24)
+        # Base download count varies by resolution and group
+        if resolution == "1080p":
+            base_downloads = rng.randint(3000, 8000)
+        elif resolution == "720p":
+            base_downloads = rng.randint(2000, 5000)
         else:
-            # Ongoing show: track until current date
-            episode_end_date = WINTER_2026_NOW
+            base_downloads = rng.randint(500, 1500)
+
+        # Popular groups get more downloads
+        if group in ["SubsPlease", "Erai-raws"]:
+            base_downloads = int(base_downloads * 1.5)
+
+        # Create torrent entry, as a plain row to skip model validation
+        torrent_rows.append(
+            (
+                infohash,
+                filename,
+                torrent_pubdate,
+                rng.randint(300_000_000, 1_500_000_000),  # 300MB-1.5GB
+                rng.randint(1000000, 9999999),  # nyaa_id
+                group in ["SubsPlease", "Erai-raws"],  # trusted
+                False,  # remake
+                rng.randint(50, 500),  # seeders
+                rng.randint(5, 50),  # leechers
+                0,  # Initial downloads (will be set by first stats entry)
+                guessit_data,
+            )
+        )
 
-        # Generate multiple versions (different groups/resolutions)
-        # In quick mode, generate fewer versions per episode for speed
-        num_groups = 1 if quick else random.randint(2, 3)
-        num_resolutions = 1 if quick else random.randint(1, 2)
-
-        for group in random.sample(RELEASE_GROUPS, k=num_groups):
-            for resolution in random.sample(RESOLUTIONS, k=num_resolutions):
-                infohash = generate_infohash(show_title, episode, group, resolution)
-                filename = generate_filename(show_title, episode, group, resolution)
-                guessit_data = generate_guessit_data(
-                    show_title, episode, group, resolution
-                )
-
-                # Torrent appears 2-6 hours after episode airs (fansub delay)
-                torrent_pubdate = episode_air_date.add(hours=random.randint(2, 6))
-
-                # Skip future torrents
-                if torrent_pubdate > WINTER_2026_NOW:
-                    continue
-
-                # Base download count varies by resolution and group
-                if resolution == "1080p":
-                    base_downloads = random.randint(3000, 8000)
-                elif resolution == "720p":
-                    base_downloads = random.randint(2000, 5000)
-                else:
-                    base_downloads = random.randint(500, 1500)
-
-                # Popular groups get more downloads
-                if group in ["SubsPlease", "Erai-raws"]:
-                    base_downloads = int(base_downloads * 1.5)
-
-                # Create torrent entry
-                torrent_data = TorrentData(
-                    infohash=infohash,
-                    filename=filename,
-                    pubdate=torrent_pubdate,
-                    size_bytes=random.randint(
-                        300_000_000, 1_500_000_000
-                    ),  # 300MB-1.5GB
-                    nyaa_id=random.randint(1000000, 9999999),
-                    trusted=group in ["SubsPlease", "Erai-raws"],
-                    remake=False,
-                    seeders=random.randint(50, 500),
-                    leechers=random.randint(5, 50),
-                    downloads=0,  # Initial downloads (will be set by first stats entry)
-                    guessit_data=guessit_data,
-                )
-
-                db.insert_torrent(torrent_data)
-
-                # Generate download curve stats
-                download_curve = generate_download_curve(
-                    torrent_pubdate,
-                    episode_end_date,
-                    base_downloads,
-                    sample_interval_hours=24,
-                )
-
-                # Batch insert all stats for this torrent
-                with db.get_conn() as conn:
-                    for timestamp, cumulative_downloads in download_curve:
-                        # Seeders and leechers decay over time too
-                        days_since_release = (
-                            timestamp - torrent_pubdate
-                        ).in_seconds() / 86400
-                        seeders = max(
-                            5,
-                            int(500 * (0.95**days_since_release))
-                            + random.randint(-10, 10),
-                        )
-                        leechers = max(
-                            0,
-                            int(50 * (0.90**days_since_release))
-                            + random.randint(-5, 5),
-                        )
-
-                        conn.execute(
-                            """
-                            INSERT OR REPLACE INTO stats (infohash, timestamp, seeders, leechers, downloads)
-                            VALUES (?, ?, ?, ?, ?)
-                            """,
-                            (
-                                infohash,
-                                timestamp,
-                                seeders,
-                                leechers,
-                                cumulative_downloads,
-                            ),
-                        )
-                    # Commit once per torrent instead of once per stat entry
-                    conn.commit()
-
-
-def generate_fake_database(db_path: str, verbose: bool = False, quick: bool = False):
+        # Generate stats curve for this torrent
+        stats_curve = generate_stats_curve(
+            rng,
+            torrent_pubdate,
+            tracking_end_date,
+            base_downloads,
+            sample_interval_hours=24,
+        )
+        stats_rows.extend((infohash, *sample) for sample in stats_curve)
+
+    # Torrents first, so the curve replaces their initial stats rows
+    db.insert_torrent_rows(torrent_rows)
+    with db.get_conn() as conn:
+        conn.executemany(INSERT_STATS_SQL, stats_rows)
+        conn.commit()
+
+
+def generate_show_shard(
+    shard_path: str,
+    seed: int,
+    show_title: str,
+    num_episodes: int,
+    air_start_date: Instant,
+    season_end_date: Instant,
+    is_complete: bool,
+    quick: bool = False,
+) -> str:
+    """Generate one show into its own database file, in a worker process.
+
+    Returns the shard path, for merge_shard.
+    """
+    db = Database(shard_path)
+    # Shards are only read back once by merge_shard, so skip index upkeep
+    drop_indexes(db)
+    generate_show_data(
+        db,
+        random.Random(seed),
+        show_title,
+        num_episodes,
+        air_start_date,
+        season_end_date,
+        is_complete,
+        quick=quick,
+    )
+    return shard_path
+
+
+def drop_indexes(db: Database) -> list[str]:
+    """Drop the schema's secondary indexes, returning their DDL for recreating.
+
+    Primary keys are kept, since inserts and the stats triggers rely on them.
+    """
+    with db.get_conn() as conn:
+        # Indexes without SQL are the automatic ones behind primary keys
+        indexes = conn.execute(
+            """
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL
+            """
+        ).fetchall()
+        for index in indexes:
+            conn.execute(f"DROP INDEX {index['name']}")
+        conn.commit()
+    return [index["sql"] for index in indexes]
+
+
+def merge_shard(db: Database, shard_path: str) -> None:
+    """Copy the torrents and stats of a shard database into db."""
+    with db.get_conn() as conn:
+        conn.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+        for table in ("torrents", "stats"):
+            # table_info leaves out generated columns, which can't be inserted
+            columns = ", ".join(
+                row["name"] for row in conn.execute(f"PRAGMA shard.table_info({table})")
+            )
+            conn.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM shard.{table}"
+            )
+        conn.commit()
+        conn.execute("DETACH DATABASE shard")
+
+
+def generate_fake_database(
+    db_path: str,
+    verbose: bool = False,
+    quick: bool = False,
+    seed: int | None = DEFAULT_SEED,
+    workers: int | None = None,
+):
     """Generate a complete fake database.
 
+    Shows are generated in parallel, each into its own shard database, and
+    then merged into db_path.
+
     Args:
         db_path: Path to output database
         verbose: Print detailed progress
         quick: Generate smaller dataset (5 shows per season) for faster testing
+        seed: Random seed, for a reproducible database (None for a fresh one)
+        workers: Number of worker processes (default: one per CPU)
     """
-    print(f"Generating fake database at: {db_path}")
+    print(f"Generating fake database at: {db_path} (seed: {seed})")
+
+    # One generator for the whole run, which also seeds each show's generator,
+    # so a seed reproduces everything regardless of worker scheduling
+    rng = random.Random(seed)
 
     # Remove existing database
     Path(db_path).unlink(missing_ok=True)
 
     # Create new database
     db = Database(db_path)
+    # Building indexes once after loading beats updating them on every insert
+    index_sql = drop_indexes(db)
 
     # Select subset of shows if in quick mode
     fall_shows = FALL_2025_SHOWS[:5] if quick else FALL_2025_SHOWS
     winter_shows = WINTER_2026_SHOWS[:5] if quick else WINTER_2026_SHOWS
 
-    # Generate Fall 2025 shows (complete season)
+    # (show_title, num_episodes, air_start, season_end, is_complete) per show
+    jobs = []
+
+    # Fall 2025 shows (complete season)
     print(f"\nGenerating Fall 2025 shows (complete)... {len(fall_shows)} shows")
     for i, show_title in enumerate(fall_shows):
-        num_episodes = random.randint(12, 13)  # Standard seasonal length
+        num_episodes = rng.randint(12, 13)  # Standard seasonal length
         # Stagger air dates throughout the season
         days_offset = (i * 2) % 7  # Different days of the week
         air_start = FALL_2025_START.add(hours=days_offset * 24)
@@ -335,22 +459,14 @@ def generate_fake_database(db_path: str, verbose: bool = False, quick: bool = Fa
         if verbose:
             print(f"  - {show_title} ({num_episodes} episodes)")
 
-        generate_show_data(
-            db,
-            show_title,
-            num_episodes,
-            air_start,
-            FALL_2025_END,
-            is_complete=True,
-            quick=quick,
-        )
+        jobs.append((show_title, num_episodes, air_start, FALL_2025_END, True))
 
-    # Generate Winter 2026 shows (currently airing)
+    # Winter 2026 shows (currently airing)
     print(
         f"\nGenerating Winter 2026 shows (currently airing)... {len(winter_shows)} shows"
     )
     for i, show_title in enumerate(winter_shows):
-        num_episodes = random.randint(12, 13)
+        num_episodes = rng.randint(12, 13)
         days_offset = (i * 2) % 7
         air_start = WINTER_2026_START.add(hours=days_offset * 24)
 
@@ -361,15 +477,30 @@ def generate_fake_database(db_path: str, verbose: bool = False, quick: bool = Fa
                 f"  - {show_title} ({episodes_so_far}/{num_episodes} episodes so far)"
             )
 
-        generate_show_data(
-            db,
-            show_title,
-            num_episodes,
-            air_start,
-            WINTER_2026_NOW,
-            is_complete=False,
-            quick=quick,
-        )
+        jobs.append((show_title, num_episodes, air_start, WINTER_2026_NOW, False))
+
+    with (
+        tempfile.TemporaryDirectory() as shard_dir,
+        ProcessPoolExecutor(max_workers=workers) as executor,
+    ):
+        futures = [
+            executor.submit(
+                generate_show_shard,
+                str(Path(shard_dir) / f"show_{i}.db"),
+                rng.getrandbits(64),
+                *job,
+                quick=quick,
+            )
+            for i, job in enumerate(jobs)
+        ]
+        # Merge in submission order, so row order doesn't depend on scheduling
+        for future in futures:
+            merge_shard(db, future.result())
+
+    with db.get_conn() as conn:
+        for sql in index_sql:
+            conn.execute(sql)
+        conn.commit()
 
     # Print summary statistics
     with db.get_conn() as conn:
@@ -415,9 +546,23 @@ def main():
         action="store_true",
         help="Generate smaller dataset (5 shows per season) for faster testing",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help="Random seed, for a reproducible database (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        help="Number of worker processes (default: one per CPU)",
+    )
     args = parser.parse_args()
 
-    generate_fake_database(args.output, args.verbose, args.quick)
+    generate_fake_database(
+        args.output, args.verbose, args.quick, args.seed, args.workers
+    )
 
 
 if __name__ == "__main__":
@@ -3,28 +3,41 @@ import pytest
 from whenever import Instant
 
 from nyaastats.database import Database
-from nyaastats.rss_fetcher import RSSFetcher
+from nyaastats.rss_fetcher import RSSFetcher, _guess_cached
 from nyaastats.scheduler import Scheduler
 from nyaastats.tracker import TrackerScraper
 
 
+@pytest.fixture(autouse=True)
+def clear_guessit_cache():
+    """Keep memoized guessit results from leaking between tests."""
+    _guess_cached.cache_clear()
+
+
 @pytest.fixture
 def fixed_time():
     """Provide a fixed time for testing."""
     return Instant.from_utc(2025, 1, 1, 12, 0, 0)
 
 
+@pytest.fixture(scope="session")
+def db_template():
+    """Initialize the schema once, for temp_db to copy."""
+    return Database(":memory:")
+
+
 @pytest.fixture
-def temp_db(fixed_time):
+def temp_db(db_template, fixed_time):
     """Create a temporary database for testing."""
-    db = Database(":memory:", now_func=lambda: fixed_time)
+    db = Database.from_template(db_template, now_func=lambda: fixed_time)
     yield db
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_client():
     """Create a mock HTTP client for testing."""
-    return httpx.Client(timeout=30.0)
+    with httpx.Client(timeout=30.0) as client:
+        yield client
 
 
 @pytest.fixture
@@ -214,6 +214,53 @@ class TestMatchBatch:
         hash1_matches = [m for h, m in matched if h == "hash1"]
         assert len(hash1_matches) == 1
 
+    def test_match_batch_repeated_entries(self, mock_shows):
+        """Test that repeated entries in a batch each get a result."""
+        matcher = FuzzyMatcher(mock_shows, threshold=70)
+
+        batch = [
+            ("hash1", "Spy x Family", None, 5),
+            ("hash2", "Spy x Family", None, 5),
+            ("hash3", "Unknown Show", None, None),
+            ("hash4", "Unknown Show", None, None),
+        ]
+
+        matched, unmatched = matcher.match_batch(batch)
+
+        assert [h for h, _ in matched] == ["hash1", "hash2"]
+        assert matched[0][1] == matched[1][1]
+        assert [h for h, _, _ in unmatched] == ["hash3", "hash4"]
+        assert unmatched[0][2] == unmatched[1][2]
+
+    def test_match_results_are_cached(self, mock_shows):
+        """Test that repeated matches reuse the earlier result."""
+        matcher = FuzzyMatcher(mock_shows, threshold=70)
+
+        result = matcher.match("Spy x Family", season=2, episode=5)
+        matched, _ = matcher.match_batch([("hash1", "Spy x Family", 2, 5)])
+
+        assert result is not None
+        assert matcher.match("Spy x Family", season=2, episode=5) is result
+        assert matched == [("hash1", result)]
+        assert matcher._match_cached.cache_info().hits == 2
+
+    def test_match_batch_workers(self, mock_shows, monkeypatch):
+        """Test that matching in worker processes gives in-process results."""
+        from nyaastats.etl import fuzzy_matcher
+
+        monkeypatch.setattr(fuzzy_matcher, "PARALLEL_MATCH_MIN_ENTRIES", 1)
+        batch = [
+            ("hash1", "One-Punch Man", 3, 1),
+            ("hash2", "Spy x Family", 2, 5),
+            ("hash3", "Unknown Show", None, None),
+            ("hash4", "2", None, None),
+        ]
+
+        expected = FuzzyMatcher(mock_shows, threshold=70).match_batch(batch)
+        result = FuzzyMatcher(mock_shows, threshold=70, workers=2).match_batch(batch)
+
+        assert result == expected
+
     def test_match_batch_logs_method_counts(self, mock_shows, caplog):
         """Test that batch matching logs statistics by method."""
         # Use lower threshold for testing
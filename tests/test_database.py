@@ -1,7 +1,10 @@
 import json
+import sqlite3
 
+import pytest
 from whenever import Instant
 
+from nyaastats.database import STATS_INSERT_BATCH, Database
 from nyaastats.models import StatsData, TorrentData
 
 
@@ -40,6 +43,52 @@ def test_database_schema(temp_db):
             assert columns[col] == col_type
 
 
+def test_from_template(db_template, fixed_time):
+    """Test copies of a template database are independent."""
+    first = Database.from_template(db_template, now_func=lambda: fixed_time)
+    second = Database.from_template(db_template)
+
+    first.insert_stats("a" * 40, StatsData(seeders=1, leechers=0, downloads=0))
+
+    assert first.now_func() == fixed_time
+    assert len(first.get_recent_stats("a" * 40)) == 1
+    assert second.get_recent_stats("a" * 40) == []
+    with db_template.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM stats").fetchone()[0] == 0
+
+
+def test_database_persists_across_connections(tmp_path, fixed_time):
+    """Test a file database keeps data across connections and reopening."""
+    db_path = str(tmp_path / "nyaastats.db")
+    db = Database(db_path, now_func=lambda: fixed_time)
+    db.insert_stats("a" * 40, StatsData(seeders=1, leechers=0, downloads=0))
+
+    assert len(db.get_recent_stats("a" * 40)) == 1
+    assert len(Database(db_path).get_recent_stats("a" * 40)) == 1
+
+
+def test_pragmas_set(tmp_path):
+    """Test file databases use WAL with relaxed per-connection syncing."""
+    db = Database(str(tmp_path / "nyaastats.db"))
+
+    with db.get_conn() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+
+def test_get_conn_keeps_caller_exception(tmp_path):
+    """Test a failing PRAGMA optimize on close doesn't replace the caller's error."""
+    db = Database(str(tmp_path / "nyaastats.db"))
+
+    with pytest.raises(ValueError, match="caller error"):
+        with db.get_conn() as conn:
+            # A closed connection makes the PRAGMA optimize on exit fail
+            conn.close()
+            raise ValueError("caller error")
+
+
 def test_insert_torrent(temp_db):
     """Test inserting a torrent."""
     guessit_data = {
@@ -87,7 +136,8 @@ def test_insert_torrent(temp_db):
         assert row["trusted"] == torrent_data.trusted
         assert row["remake"] == torrent_data.remake
 
-        # Check that guessit data was stored as JSON
+        # Check that guessit data was stored as compact JSON
+        assert row["guessit_data"] == json.dumps(guessit_data, separators=(",", ":"))
         stored_guessit = json.loads(row["guessit_data"])
         assert stored_guessit["title"] == "Anime"
         assert stored_guessit["episode"] == 1
@@ -189,6 +239,33 @@ def test_get_torrent_exists(temp_db):
     assert temp_db.get_torrent_exists(infohash)
 
 
+def test_get_known_torrents(temp_db):
+    """Test looking up which of many torrents are stored in one query."""
+    torrents = [
+        TorrentData(
+            infohash=infohash,
+            filename=f"[Test] Anime Episode 01 [{infohash[:4]}].mkv",
+            pubdate=Instant.from_utc(2023, 1, 1, 12, 0, 0),
+            size_bytes=1000000000,
+            nyaa_id=12345,
+            trusted=True,
+            remake=False,
+            seeders=10,
+            leechers=2,
+            downloads=100,
+            guessit_data=guessit_data,
+        )
+        for infohash, guessit_data in [("a" * 40, {"title": "Anime"}), ("b" * 40, None)]
+    ]
+    temp_db.insert_torrents_bulk(torrents)
+
+    assert temp_db.get_known_torrents(["a" * 40, "b" * 40, "c" * 40]) == {
+        "a" * 40: True,
+        "b" * 40: False,
+    }
+    assert temp_db.get_known_torrents([]) == {}
+
+
 def test_get_recent_stats(temp_db):
     """Test getting recent statistics."""
     infohash = "abcdef1234567890abcdef1234567890abcdef12"
@@ -231,6 +308,20 @@ def test_vacuum(temp_db):
     temp_db.vacuum()
 
 
+def test_analyze(temp_db):
+    """Test rebuilding planner statistics."""
+    temp_db.analyze()
+
+    with temp_db.get_conn() as conn:
+        tables = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            ).fetchall()
+        }
+    assert "sqlite_stat1" in tables
+
+
 def test_indexes_exist(temp_db):
     """Test that required indexes exist."""
     with temp_db.get_conn() as conn:
@@ -238,15 +329,42 @@ def test_indexes_exist(temp_db):
         indexes = [row[0] for row in cursor.fetchall()]
 
         expected_indexes = [
-            "idx_stats_infohash",
             "idx_stats_timestamp",
+            "idx_stats_recent",
             "idx_torrents_pubdate",
             "idx_torrents_status",
+            "idx_torrents_active",
+            "idx_torrents_active_due",
         ]
 
         for index in expected_indexes:
             assert index in indexes
 
+        # Redundant with the stats primary key and idx_stats_recent
+        assert "idx_stats_infohash" not in indexes
+
+
+def test_recent_stats_uses_covering_index(temp_db):
+    """Test that recent stats are read from an index alone, without a sort."""
+    with temp_db.get_conn() as conn:
+        plan = " ".join(
+            row["detail"]
+            for row in conn.execute(
+                """
+                EXPLAIN QUERY PLAN
+                SELECT seeders, leechers, downloads, timestamp
+                FROM stats
+                WHERE infohash = ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+                """,
+                ("abcdef1234567890abcdef1234567890abcdef12", 3),
+            )
+        )
+
+    assert "COVERING INDEX idx_stats_recent" in plan
+    assert "TEMP B-TREE" not in plan
+
 
 def test_insert_duplicate_torrent(temp_db):
     """Test inserting duplicate torrent (should be ignored)."""
@@ -303,3 +421,315 @@ def test_insert_duplicate_torrent(temp_db):
 
         stored_guessit = json.loads(row["guessit_data"])
         assert stored_guessit["title"] == "First"
+
+
+def test_insert_torrents_bulk(temp_db):
+    """Test inserting many torrents in one call."""
+    torrents = [
+        TorrentData(
+            infohash=f"abcdef1234567890abcdef1234567890abcdef{i:02d}",
+            filename=f"[Test] Anime Episode {i:02d} [1080p].mkv",
+            pubdate=Instant.from_utc(2023, 1, 1, 12, i, 0),
+            size_bytes=1000000000,
+            nyaa_id=12345 + i,
+            trusted=True,
+            remake=False,
+            seeders=10 + i,
+            leechers=2,
+            downloads=100,
+            guessit_data={"title": "Anime", "episode": i} if i % 2 else None,
+        )
+        for i in range(5)
+    ]
+
+    temp_db.insert_torrents_bulk(torrents)
+    # Re-inserting is ignored just like insert_torrent
+    temp_db.insert_torrents_bulk(torrents[:2])
+
+    with temp_db.get_conn() as conn:
+        torrent_count = conn.execute("SELECT COUNT(*) FROM torrents").fetchone()[0]
+        stats_count = conn.execute("SELECT COUNT(*) FROM stats").fetchone()[0]
+        row = conn.execute(
+            "SELECT guessit_data FROM torrents WHERE infohash = ?",
+            (torrents[1].infohash,),
+        ).fetchone()
+
+    assert torrent_count == 5
+    assert stats_count == 5
+    assert json.loads(row["guessit_data"]) == {"title": "Anime", "episode": 1}
+
+    for torrent_data in torrents:
+        recent = temp_db.get_recent_stats(torrent_data.infohash, limit=1)
+        assert recent[0]["seeders"] == torrent_data.seeders
+
+
+def test_insert_torrents_bulk_empty(temp_db):
+    """Test bulk insert with no torrents is a no-op."""
+    temp_db.insert_torrents_bulk([])
+
+    with temp_db.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM torrents").fetchone()[0] == 0
+
+
+def test_insert_torrent_rows(temp_db):
+    """Test inserting torrents from plain tuples."""
+    pubdate = Instant.from_utc(2023, 1, 1, 12, 0, 0)
+    temp_db.insert_torrent_rows(
+        [
+            (
+                "abcdef1234567890abcdef1234567890abcdef12",
+                "[Test] Anime Episode 01 [1080p].mkv",
+                pubdate,
+                1000000000,
+                12345,
+                True,
+                False,
+                10,
+                2,
+                100,
+                {"title": "Anime", "episode": 1},
+            ),
+            (
+                "1234567890abcdef1234567890abcdef12345678",
+                "[Test] Anime Episode 02 [1080p].mkv",
+                pubdate,
+                1000000000,
+                None,
+                False,
+                False,
+                5,
+                1,
+                50,
+                None,
+            ),
+        ]
+    )
+
+    with temp_db.get_conn() as conn:
+        rows = conn.execute(
+            "SELECT nyaa_id, guessit_data FROM torrents ORDER BY infohash"
+        ).fetchall()
+        assert [row["nyaa_id"] for row in rows] == [None, 12345]
+        assert rows[0]["guessit_data"] is None
+        assert json.loads(rows[1]["guessit_data"]) == {"title": "Anime", "episode": 1}
+
+    stats = temp_db.get_recent_stats("abcdef1234567890abcdef1234567890abcdef12")
+    assert [(s["seeders"], s["leechers"], s["downloads"]) for s in stats] == [
+        (10, 2, 100)
+    ]
+
+
+def test_insert_stats_bulk(temp_db):
+    """Test inserting stats for several torrents at one timestamp."""
+    stats = {
+        "abcdef1234567890abcdef1234567890abcdef12": StatsData(
+            seeders=10, leechers=2, downloads=100
+        ),
+        "fedcba0987654321fedcba0987654321fedcba09": StatsData(
+            seeders=0, leechers=0, downloads=0
+        ),
+    }
+    temp_db.insert_stats_bulk(stats)
+    temp_db.insert_stats_bulk({})
+
+    for infohash, expected in stats.items():
+        recent = temp_db.get_recent_stats(infohash, limit=3)
+        assert len(recent) == 1
+        assert recent[0]["timestamp"] == "2025-01-01T12:00:00Z"
+        assert recent[0]["seeders"] == expected.seeders
+        assert recent[0]["leechers"] == expected.leechers
+        assert recent[0]["downloads"] == expected.downloads
+
+
+def test_insert_stats_many(temp_db):
+    """Test inserting stats rows with their own timestamps."""
+    infohash = "abcdef1234567890abcdef1234567890abcdef12"
+    items = [
+        (infohash, StatsData(seeders=i, leechers=0, downloads=10 * i), timestamp)
+        for i, timestamp in enumerate(
+            [
+                Instant.from_utc(2023, 1, 1, 12, 0, 0),
+                Instant.from_utc(2023, 1, 1, 13, 0, 0),
+                Instant.from_utc(2023, 1, 1, 14, 0, 0),
+            ]
+        )
+    ]
+    temp_db.insert_stats_many(items)
+    temp_db.insert_stats_many([])
+
+    recent = temp_db.get_recent_stats(infohash, limit=5)
+    assert [row["timestamp"] for row in recent] == [
+        "2023-01-01T14:00:00Z",
+        "2023-01-01T13:00:00Z",
+        "2023-01-01T12:00:00Z",
+    ]
+    assert [row["downloads"] for row in recent] == [20, 10, 0]
+
+
+def test_insert_stats_many_batched(temp_db):
+    """Test inserting more stats rows than fit in one multi-row INSERT."""
+    timestamp = Instant.from_utc(2023, 1, 1, 12, 0, 0)
+    count = STATS_INSERT_BATCH * 2 + 10
+    items = [
+        (f"{i:040x}", StatsData(seeders=i, leechers=0, downloads=0), timestamp)
+        for i in range(count)
+    ]
+    # A repeated key in a later chunk replaces the earlier row
+    items.append(
+        (f"{0:040x}", StatsData(seeders=99, leechers=0, downloads=0), timestamp)
+    )
+    temp_db.insert_stats_many(items)
+
+    with temp_db.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM stats").fetchone()[0] == count
+    assert temp_db.get_recent_stats(f"{0:040x}")[0]["seeders"] == 99
+    assert temp_db.get_recent_stats(f"{count - 1:040x}")[0]["seeders"] == count - 1
+
+
+def test_tuple_cursor(temp_db):
+    """Test tuple cursors return plain tuples without changing the connection."""
+    infohash = "abcdef1234567890abcdef1234567890abcdef12"
+    temp_db.insert_stats(
+        infohash,
+        StatsData(seeders=10, leechers=2, downloads=100),
+        Instant.from_utc(2023, 1, 1, 12, 0, 0),
+    )
+
+    with temp_db.get_conn() as conn:
+        cursor = temp_db.tuple_cursor(conn).execute(
+            "SELECT seeders, leechers, downloads FROM stats WHERE infohash = ?",
+            (infohash,),
+        )
+        assert cursor.fetchall() == [(10, 2, 100)]
+        assert conn.row_factory is sqlite3.Row
+
+
+def test_torrent_last_scrape_tracks_stats(temp_db):
+    """Test that the last scrape table follows stats inserts and deletes."""
+    torrent_data = TorrentData(
+        infohash="abcdef1234567890abcdef1234567890abcdef12",
+        filename="[Test] Anime Episode 01 [1080p].mkv",
+        pubdate=Instant.from_utc(2025, 1, 1, 10, 0, 0),
+        size_bytes=1000000000,
+        nyaa_id=12345,
+        trusted=True,
+        remake=False,
+        seeders=10,
+        leechers=2,
+        downloads=100,
+        guessit_data=None,
+    )
+    temp_db.insert_torrent(torrent_data)
+
+    def last_scrape():
+        with temp_db.get_conn() as conn:
+            row = conn.execute(
+                "SELECT last_scrape FROM torrent_last_scrape WHERE infohash = ?",
+                (torrent_data.infohash,),
+            ).fetchone()
+            return row["last_scrape"] if row else None
+
+    # Initial RSS stats count as a scrape
+    assert last_scrape() == "2025-01-01T10:00:00Z"
+
+    stats = StatsData(seeders=5, leechers=1, downloads=150)
+    temp_db.insert_stats(
+        torrent_data.infohash, stats, Instant.from_utc(2025, 1, 1, 12, 0, 0)
+    )
+    # Out-of-order inserts don't move it backwards
+    temp_db.insert_stats(
+        torrent_data.infohash, stats, Instant.from_utc(2025, 1, 1, 11, 0, 0)
+    )
+    assert last_scrape() == "2025-01-01T12:00:00Z"
+
+    with temp_db.get_conn() as conn:
+        conn.execute("DELETE FROM stats WHERE timestamp = ?", ("2025-01-01T12:00:00Z",))
+        conn.commit()
+    assert last_scrape() == "2025-01-01T11:00:00Z"
+
+    with temp_db.get_conn() as conn:
+        conn.execute("DELETE FROM stats")
+        conn.commit()
+    assert last_scrape() is None
+
+
+def test_next_scrape_due_follows_schedule(temp_db):
+    """Test that next_scrape_due is maintained from the time-decay schedule."""
+    torrent_data = TorrentData(
+        infohash="abcdef1234567890abcdef1234567890abcdef12",
+        filename="[Test] Anime Episode 01 [1080p].mkv",
+        pubdate=Instant.from_utc(2024, 12, 30, 12, 0, 0),
+        size_bytes=1000000000,
+        nyaa_id=12345,
+        trusted=True,
+        remake=False,
+        seeders=10,
+        leechers=2,
+        downloads=100,
+        guessit_data=None,
+    )
+    temp_db.insert_torrent(torrent_data)
+
+    def next_scrape_due():
+        with temp_db.get_conn() as conn:
+            return conn.execute(
+                "SELECT next_scrape_due FROM torrents WHERE infohash = ?",
+                (torrent_data.infohash,),
+            ).fetchone()["next_scrape_due"]
+
+    # Hourly for the first 2 days, counting the initial RSS stats
+    assert next_scrape_due() == "2024-12-30T13:00:00Z"
+
+    # An hour past the last scrape would leave the hourly tier, so the next
+    # scrape waits 4 hours instead
+    stats = StatsData(seeders=5, leechers=1, downloads=150)
+    temp_db.insert_stats(
+        torrent_data.infohash, stats, Instant.from_utc(2025, 1, 1, 11, 30, 0)
+    )
+    assert next_scrape_due() == "2025-01-01T15:30:00Z"
+
+    # Never scraped torrents are due from their pubdate
+    with temp_db.get_conn() as conn:
+        conn.execute("DELETE FROM stats")
+        conn.commit()
+    assert next_scrape_due() == "2024-12-30T12:00:00Z"
+
+    # Past 180 days it is never due again
+    temp_db.insert_stats(
+        torrent_data.infohash, stats, Instant.from_utc(2025, 6, 25, 0, 0, 0)
+    )
+    assert next_scrape_due() is None
+
+
+def test_schedule_tier_boundaries(temp_db):
+    """Test that tier boundary columns are derived from pubdate."""
+    torrent_data = TorrentData(
+        infohash="abcdef1234567890abcdef1234567890abcdef12",
+        filename="[Test] Anime Episode 01 [1080p].mkv",
+        pubdate=Instant.from_utc(2025, 1, 1, 12, 0, 0),
+        size_bytes=1000000000,
+        nyaa_id=12345,
+        trusted=True,
+        remake=False,
+        seeders=10,
+        leechers=2,
+        downloads=100,
+        guessit_data=None,
+    )
+    temp_db.insert_torrent(torrent_data)
+
+    with temp_db.get_conn() as conn:
+        row = conn.execute(
+            """
+            SELECT hourly_until, every_4h_until, daily_until, weekly_until
+            FROM torrents WHERE infohash = ?
+            """,
+            (torrent_data.infohash,),
+        ).fetchone()
+
+    assert dict(row) == {
+        "hourly_until": "2025-01-03T12:00:00Z",
+        "every_4h_until": "2025-01-08T12:00:00Z",
+        "daily_until": "2025-01-31T12:00:00Z",
+        "weekly_until": "2025-06-30T12:00:00Z",
+    }
@@ -1,5 +1,6 @@
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
 from whenever import Instant
 
@@ -7,7 +8,7 @@ from nyaastats.html_scraper import HtmlScraper
 from nyaastats.models import TorrentData
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def example_html():
     """Load the example HTML fixture."""
     with open("tests/fixtures/example.html", encoding="utf-8") as f:
@@ -152,17 +153,18 @@ def test_process_page(html_scraper, example_html):
     html_scraper.fetch_page = Mock(return_value=example_html)
 
     # Mock database methods
-    html_scraper.db.get_torrent_exists = Mock(return_value=False)
-    html_scraper.db.insert_torrent = Mock()
+    html_scraper.db.get_known_torrents = Mock(return_value={})
+    html_scraper.db.insert_torrents_bulk = Mock()
 
     result = html_scraper.process_page(page=1)
 
     # Should have processed some torrents
     assert result > 0
 
-    # Check that database methods were called
-    assert html_scraper.db.get_torrent_exists.called
-    assert html_scraper.db.insert_torrent.called
+    # Check that database methods were called once for the whole page
+    html_scraper.db.get_known_torrents.assert_called_once()
+    html_scraper.db.insert_torrents_bulk.assert_called_once()
+    assert len(html_scraper.db.insert_torrents_bulk.call_args.args[0]) == result
 
 
 def test_process_page_existing_torrents(html_scraper, example_html):
@@ -170,17 +172,30 @@ def test_process_page_existing_torrents(html_scraper, example_html):
     # Mock the fetch_page method
     html_scraper.fetch_page = Mock(return_value=example_html)
 
-    # Mock database to always return True (torrent exists)
-    html_scraper.db.get_torrent_exists = Mock(return_value=True)
-    html_scraper.db.insert_torrent = Mock()
+    # Mock database to report every torrent as stored
+    html_scraper.db.get_known_torrents = Mock(
+        side_effect=lambda infohashes: dict.fromkeys(infohashes, True)
+    )
+    html_scraper.db.insert_torrents_bulk = Mock()
 
     result = html_scraper.process_page(page=1)
 
     # Should have processed 0 new torrents
     assert result == 0
 
-    # Check that insert_torrent was not called
-    assert not html_scraper.db.insert_torrent.called
+    # Check that no torrents were inserted
+    html_scraper.db.insert_torrents_bulk.assert_called_once_with([])
+
+
+def test_process_page_inserts_torrents(html_scraper, example_html):
+    """Test processing a page stores its torrents once."""
+    html_scraper.fetch_page = Mock(return_value=example_html)
+    torrents = html_scraper.parse_html_page(example_html)
+
+    assert html_scraper.process_page(page=1) == len(torrents)
+    assert html_scraper.process_page(page=2) == 0
+    for torrent_data in torrents:
+        assert html_scraper.db.get_torrent_exists(torrent_data.infohash)
 
 
 def test_parse_torrent_with_comments(html_scraper, example_html):
@@ -316,3 +331,61 @@ def test_fetch_page_default_behavior_unchanged(temp_db, fixed_time):
     mock_client.get.assert_called_once_with(
         "https://nyaa.si", params={"c": "1_2", "f": "0", "p": "1"}
     )
+
+
+def test_process_pages_fetches_concurrently(temp_db, fixed_time, example_html):
+    """Test fetching several pages through the async client."""
+    mock_response = Mock()
+    mock_response.text = example_html
+    mock_response.raise_for_status = Mock()
+
+    with httpx.Client() as client:
+        scraper = HtmlScraper(temp_db, client, now_func=lambda: fixed_time)
+        with patch.object(
+            httpx.AsyncClient, "get", new=AsyncMock(return_value=mock_response)
+        ) as mock_get:
+            processed = scraper.process_pages([1, 2, 3])
+
+    # Each page lists the same torrents; they are only stored once
+    assert processed == len(scraper.parse_html_page(example_html))
+    assert mock_get.await_count == 3
+    requested = {call.kwargs["params"]["p"] for call in mock_get.await_args_list}
+    assert requested == {"1", "2", "3"}
+
+
+def test_process_pages_skips_failed_page(temp_db, fixed_time, example_html):
+    """Test that one failing page does not abort the other pages."""
+    mock_response = Mock()
+    mock_response.text = example_html
+    mock_response.raise_for_status = Mock()
+
+    with httpx.Client() as client:
+        scraper = HtmlScraper(temp_db, client, now_func=lambda: fixed_time)
+        with patch.object(
+            httpx.AsyncClient,
+            "get",
+            new=AsyncMock(side_effect=[Exception("HTTP Error"), mock_response]),
+        ):
+            processed = scraper.process_pages([1, 2])
+
+    assert processed == len(scraper.parse_html_page(example_html))
+
+
+def test_process_pages_parse_workers(temp_db, fixed_time, example_html):
+    """Test parsing fetched pages in worker processes."""
+    mock_response = Mock()
+    mock_response.text = example_html
+    mock_response.raise_for_status = Mock()
+
+    with httpx.Client() as client:
+        scraper = HtmlScraper(
+            temp_db, client, now_func=lambda: fixed_time, parse_workers=2
+        )
+        with patch.object(
+            httpx.AsyncClient, "get", new=AsyncMock(return_value=mock_response)
+        ):
+            processed = scraper.process_pages([1, 2])
+
+    torrents = scraper.parse_html_page(example_html)
+    assert processed == len(torrents)
+    assert all(temp_db.get_torrent_exists(t.infohash) for t in torrents)
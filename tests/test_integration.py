@@ -12,7 +12,7 @@ from nyaastats.scheduler import Scheduler
 from nyaastats.tracker import TrackerScraper
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def example_rss_content():
     """Load the example RSS fixture."""
     fixture_path = Path(__file__).parent / "fixtures" / "example.rss"
@@ -29,7 +29,10 @@ def test_end_to_end_rss_processing(temp_db, example_rss_content):
     # Mock HTTP response
     mock_response = Mock()
     mock_response.text = example_rss_content
+    mock_response.content = example_rss_content.encode()
     mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
 
     # Mock the client.get method directly
     with patch.object(rss_fetcher.client, "get", return_value=mock_response):
@@ -124,11 +127,14 @@ def test_scheduler_integration(temp_db):
     # Mock HTTP response and process RSS
     mock_response = Mock()
     mock_response.text = test_rss_content
+    mock_response.content = test_rss_content.encode()
     mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
 
     # Mock the client.get method directly
     with patch.object(rss_fetcher.client, "get", return_value=mock_response):
-        with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
             mock_guessit.return_value = {"title": "Test Anime", "type": "episode"}
 
             # Process RSS
@@ -201,11 +207,14 @@ def test_tracker_integration(temp_db):
     # Process RSS first
     mock_response = Mock()
     mock_response.text = test_rss_content
+    mock_response.content = test_rss_content.encode()
     mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
 
     # Mock the client.get method directly
     with patch.object(rss_fetcher.client, "get", return_value=mock_response):
-        with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
             mock_guessit.return_value = {"title": "Test Anime", "type": "episode"}
 
             processed = rss_fetcher.process_feed()
@@ -338,12 +347,15 @@ def test_guessit_failure_handling(temp_db):
 
     mock_response = Mock()
     mock_response.text = rss_content
+    mock_response.content = rss_content.encode()
     mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
 
     # Mock the client.get method directly
     with patch.object(rss_fetcher.client, "get", return_value=mock_response):
         # Mock guessit to raise an exception
-        with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
             mock_guessit.side_effect = Exception("Guessit parsing failed")
 
             # Process should still work despite guessit failure
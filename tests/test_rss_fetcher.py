@@ -1,9 +1,10 @@
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from whenever import Instant
 
-from nyaastats.rss_fetcher import RSSFetcher
+from nyaastats.models import TorrentData
+from nyaastats.rss_fetcher import Feed, FeedEntry, RSSFetcher, _guess_from_title
 
 
 @pytest.fixture
@@ -56,7 +57,10 @@ def test_fetch_feed(rss_fetcher, mock_rss_response):
     # Mock HTTP response
     mock_response = Mock()
     mock_response.text = mock_rss_response
+    mock_response.content = mock_rss_response.encode()
     mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
 
     # Mock the client.get method directly
     with patch.object(rss_fetcher.client, "get", return_value=mock_response):
@@ -73,27 +77,28 @@ def test_fetch_feed(rss_fetcher, mock_rss_response):
         feed = rss_fetcher.fetch_feed(page=2)
 
         # Verify URL was called with page parameter
-        rss_fetcher.client.get.assert_called_with(f"{rss_fetcher.feed_url}&p=2")
+        assert rss_fetcher.client.get.call_args[0][0] == f"{rss_fetcher.feed_url}&p=2"
 
 
 def test_parse_entry_basic(rss_fetcher):
     """Test basic entry parsing."""
     # Create a mock entry
-    entry = Mock()
-    entry.title = "[TestGroup] Test Anime S01E01 [1080p] [x264] [AAC].mkv"
-    entry.guid = "https://nyaa.si/view/123456"
-    entry.published = "Wed, 01 Jan 2025 12:00:00 +0000"
-    entry.published_parsed = (2025, 1, 1, 12, 0, 0, 2, 1, 0)
-    entry.nyaa_infohash = "abcdef1234567890abcdef1234567890abcdef12"
-    entry.nyaa_size = "1.5 GiB"
-    entry.nyaa_trusted = "Yes"
-    entry.nyaa_remake = "No"
-    entry.nyaa_seeders = "10"
-    entry.nyaa_leechers = "2"
-    entry.nyaa_downloads = "100"
+    entry = FeedEntry(
+        title="[TestGroup] Test Anime S01E01 [1080p] [x264] [AAC].mkv",
+        guid="https://nyaa.si/view/123456",
+        published="Wed, 01 Jan 2025 12:00:00 +0000",
+        published_parsed=(2025, 1, 1, 12, 0, 0, 2, 1, 0),
+        nyaa_infohash="abcdef1234567890abcdef1234567890abcdef12",
+        nyaa_size="1.5 GiB",
+        nyaa_trusted="Yes",
+        nyaa_remake="No",
+        nyaa_seeders="10",
+        nyaa_leechers="2",
+        nyaa_downloads="100",
+    )
 
     # Mock guessit
-    with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+    with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
         mock_guessit.return_value = {
             "title": "Test Anime",
             "season": 1,
@@ -131,21 +136,22 @@ def test_parse_entry_basic(rss_fetcher):
 
 def test_parse_entry_guessit_failure(rss_fetcher):
     """Test entry parsing when guessit fails."""
-    entry = Mock()
-    entry.title = "[TestGroup] Test Anime S01E01 [1080p] [x264] [AAC].mkv"
-    entry.guid = "https://nyaa.si/view/123456"
-    entry.published = "Wed, 01 Jan 2025 12:00:00 +0000"
-    entry.published_parsed = (2025, 1, 1, 12, 0, 0, 2, 1, 0)
-    entry.nyaa_infohash = "abcdef1234567890abcdef1234567890abcdef12"
-    entry.nyaa_size = "1.5 GiB"
-    entry.nyaa_trusted = "Yes"
-    entry.nyaa_remake = "No"
-    entry.nyaa_seeders = "10"
-    entry.nyaa_leechers = "2"
-    entry.nyaa_downloads = "100"
+    entry = FeedEntry(
+        title="[TestGroup] Test Anime S01E01 [1080p] [x264] [AAC].mkv",
+        guid="https://nyaa.si/view/123456",
+        published="Wed, 01 Jan 2025 12:00:00 +0000",
+        published_parsed=(2025, 1, 1, 12, 0, 0, 2, 1, 0),
+        nyaa_infohash="abcdef1234567890abcdef1234567890abcdef12",
+        nyaa_size="1.5 GiB",
+        nyaa_trusted="Yes",
+        nyaa_remake="No",
+        nyaa_seeders="10",
+        nyaa_leechers="2",
+        nyaa_downloads="100",
+    )
 
     # Mock guessit to raise an exception
-    with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+    with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
         mock_guessit.side_effect = Exception("Guessit error")
 
         torrent_data = rss_fetcher.parse_entry(entry)
@@ -163,24 +169,25 @@ def test_parse_entry_guessit_failure(rss_fetcher):
 
 def test_parse_entry_missing_fields(rss_fetcher):
     """Test entry parsing with missing optional fields."""
-    entry = Mock()
-    entry.title = "Test Torrent"
-    entry.guid = ""
-    entry.published = ""
-    entry.published_parsed = None
-    entry.nyaa_infohash = "abcdef1234567890abcdef1234567890abcdef12"
-    entry.nyaa_size = ""
-    entry.nyaa_trusted = "No"
-    entry.nyaa_remake = "Yes"
-    entry.nyaa_seeders = "0"
-    entry.nyaa_leechers = "0"
-    entry.nyaa_downloads = "0"
+    entry = FeedEntry(
+        title="Test Torrent",
+        guid="",
+        published="",
+        published_parsed=None,
+        nyaa_infohash="abcdef1234567890abcdef1234567890abcdef12",
+        nyaa_size="",
+        nyaa_trusted="No",
+        nyaa_remake="Yes",
+        nyaa_seeders="0",
+        nyaa_leechers="0",
+        nyaa_downloads="0",
+    )
 
     # Since we use controlled time through fixtures, no mocking needed
     # Mock guessit
     from unittest.mock import patch
 
-    with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+    with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
         mock_guessit.return_value = {}
 
         torrent_data = rss_fetcher.parse_entry(entry)
@@ -200,17 +207,48 @@ def test_parse_entry_missing_fields(rss_fetcher):
         assert torrent_data.guessit_data == {}
 
 
+def test_parse_entry_caches_guessit(rss_fetcher):
+    """Test that repeated titles only run guessit once."""
+    entry = FeedEntry(
+        title="[TestGroup] Test Anime S01E01 [1080p].mkv",
+        guid="https://nyaa.si/view/123456",
+        published="",
+        published_parsed=None,
+        nyaa_infohash="abcdef1234567890abcdef1234567890abcdef12",
+        nyaa_size="1 GiB",
+        nyaa_trusted="No",
+        nyaa_remake="No",
+        nyaa_seeders="0",
+        nyaa_leechers="0",
+        nyaa_downloads="0",
+    )
+
+    with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
+        mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+
+        first = rss_fetcher.parse_entry(entry)
+        second = rss_fetcher.parse_entry(entry)
+
+        assert mock_guessit.call_count == 1
+        assert first.guessit_data == second.guessit_data
+        # Each caller gets its own copy of the cached result
+        assert first.guessit_data is not second.guessit_data
+
+
 def test_process_feed(rss_fetcher, mock_rss_response):
     """Test processing RSS feed."""
     # Mock HTTP response
     mock_response = Mock()
     mock_response.text = mock_rss_response
+    mock_response.content = mock_rss_response.encode()
     mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
 
     # Mock the client.get method directly
     with patch.object(rss_fetcher.client, "get", return_value=mock_response):
         # Mock guessit
-        with patch("nyaastats.rss_fetcher.guessit.guessit") as mock_guessit:
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
             mock_guessit.return_value = {
                 "title": "Test Anime",
                 "season": 1,
@@ -236,10 +274,10 @@ def test_process_feed(rss_fetcher, mock_rss_response):
 def test_process_feed_skip_invalid_entries(rss_fetcher):
     """Test processing feed with invalid entries."""
     # Mock feed with invalid entry
-    mock_feed = Mock()
+    mock_feed = Feed()
     mock_feed.entries = [
-        Mock(title="", nyaa_infohash=""),  # Invalid entry
-        Mock(
+        FeedEntry(title="", nyaa_infohash=""),  # Invalid entry
+        FeedEntry(
             title="Valid Title",
             nyaa_infohash="abcdef1234567890abcdef1234567890abcdef12",
         ),
@@ -288,11 +326,71 @@ def test_process_feed_skip_invalid_entries(rss_fetcher):
             assert processed == 1
 
 
+def test_process_feed_marks_known_guessit_failures(rss_fetcher):
+    """Test that only already-tracked torrents are marked guessit_failed."""
+    known = "abcdef1234567890abcdef1234567890abcdef12"
+    new = "fedcba0987654321fedcba0987654321fedcba09"
+    rss_fetcher.db.insert_torrent(
+        TorrentData(
+            infohash=known,
+            filename="Known Title",
+            pubdate=Instant.from_utc(2025, 1, 1),
+            size_bytes=0,
+            seeders=0,
+            leechers=0,
+            downloads=0,
+        )
+    )
+    feed = Feed(
+        entries=[
+            FeedEntry(title="Known Title", nyaa_infohash=known),
+            FeedEntry(title="New Title", nyaa_infohash=new),
+        ]
+    )
+
+    with (
+        patch.object(rss_fetcher, "fetch_feed", return_value=feed),
+        patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit,
+    ):
+        mock_guessit.side_effect = Exception("Guessit error")
+        # Only the new torrent is parsed and inserted
+        assert rss_fetcher.process_feed() == 1
+
+    with rss_fetcher.db.get_conn() as conn:
+        statuses = dict(conn.execute("SELECT infohash, status FROM torrents"))
+
+    assert statuses == {known: "guessit_failed", new: "active"}
+
+
+def test_process_feed_skips_known_torrents(rss_fetcher):
+    """Test that entries already stored are not parsed again."""
+    entry = FeedEntry(
+        title="[TestGroup] Test Anime - 01 [1080p].mkv",
+        nyaa_infohash="ABCDEF1234567890ABCDEF1234567890ABCDEF12",
+    )
+    feed = Feed(entries=[entry])
+
+    with (
+        patch.object(rss_fetcher, "fetch_feed", return_value=feed),
+        patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit,
+    ):
+        mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+        assert rss_fetcher.process_feed() == 1
+
+        with patch.object(rss_fetcher, "parse_entry") as mock_parse:
+            assert rss_fetcher.process_feed() == 0
+            mock_parse.assert_not_called()
+
+    with rss_fetcher.db.get_conn() as conn:
+        row = conn.execute("SELECT status FROM torrents").fetchone()
+    assert row["status"] == "active"
+
+
 def test_process_feed_exception_handling(rss_fetcher):
     """Test process_feed handles exceptions gracefully."""
     # Mock feed with entry that causes exception
-    mock_feed = Mock()
-    mock_feed.entries = [Mock(title="Test Entry")]
+    mock_feed = Feed()
+    mock_feed.entries = [FeedEntry(title="Test Entry")]
 
     with patch.object(rss_fetcher, "fetch_feed") as mock_fetch:
         mock_fetch.return_value = mock_feed
@@ -310,18 +408,19 @@ def test_process_feed_exception_handling(rss_fetcher):
 def test_parse_entry_with_real_guessit(rss_fetcher):
     """Test parsing entry with real guessit to ensure JSON encoding works."""
     # Use a realistic filename that will likely trigger various guessit types
-    entry = Mock()
-    entry.title = "[Yameii] New Saga - S01E01 [English Dub] [CR WEB-DL 1080p]"
-    entry.guid = "https://nyaa.si/view/123456"
-    entry.published = "Wed, 01 Jan 2025 12:00:00 +0000"
-    entry.published_parsed = (2025, 1, 1, 12, 0, 0, 2, 1, 0)
-    entry.nyaa_infohash = "abcdef1234567890abcdef1234567890abcdef12"
-    entry.nyaa_size = "1.5 GiB"
-    entry.nyaa_trusted = "Yes"
-    entry.nyaa_remake = "No"
-    entry.nyaa_seeders = "10"
-    entry.nyaa_leechers = "2"
-    entry.nyaa_downloads = "100"
+    entry = FeedEntry(
+        title="[Yameii] New Saga - S01E01 [English Dub] [CR WEB-DL 1080p]",
+        guid="https://nyaa.si/view/123456",
+        published="Wed, 01 Jan 2025 12:00:00 +0000",
+        published_parsed=(2025, 1, 1, 12, 0, 0, 2, 1, 0),
+        nyaa_infohash="abcdef1234567890abcdef1234567890abcdef12",
+        nyaa_size="1.5 GiB",
+        nyaa_trusted="Yes",
+        nyaa_remake="No",
+        nyaa_seeders="10",
+        nyaa_leechers="2",
+        nyaa_downloads="100",
+    )
 
     # Use real guessit - don't mock it
     torrent_data = rss_fetcher.parse_entry(entry)
@@ -340,3 +439,205 @@ def test_parse_entry_with_real_guessit(rss_fetcher):
     # Basic test that expected fields are present and properly serialized
     if "title" in torrent_data.guessit_data:
         assert isinstance(torrent_data.guessit_data["title"], str)
+
+
+def test_process_feed_guessit_workers(temp_db, fixed_time):
+    """Test that guessit results from worker processes match in-process ones."""
+    import httpx
+
+    fetcher = RSSFetcher(
+        temp_db, httpx.Client(), now_func=lambda: fixed_time, guessit_workers=2
+    )
+    titles = [
+        "[Yameii] New Saga - S01E01 [English Dub] [CR WEB-DL 1080p]",
+        "[SubsPlease] Test Anime - 05 (1080p) [ABCD1234].mkv",
+    ]
+    entries = []
+    for i, title in enumerate(titles):
+        entry = FeedEntry(
+            title=title,
+            guid=f"https://nyaa.si/view/{i}",
+            published="",
+            published_parsed=None,
+            nyaa_infohash=f"{i:040x}",
+            nyaa_size="1 GiB",
+            nyaa_trusted="No",
+            nyaa_remake="No",
+            nyaa_seeders="0",
+            nyaa_leechers="0",
+            nyaa_downloads="0",
+        )
+        entries.append(entry)
+
+    guesses = fetcher._guess_titles(set(titles))
+
+    assert guesses == {title: _guess_from_title(title) for title in titles}
+    assert fetcher._process_entries(entries) == 2
+
+
+def test_process_pages_fetches_concurrently(rss_fetcher, mock_rss_response):
+    """Test fetching several feed pages through the async client."""
+    import httpx
+
+    mock_response = Mock()
+    mock_response.text = mock_rss_response
+    mock_response.content = mock_rss_response.encode()
+    mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+
+    with patch.object(
+        httpx.AsyncClient, "get", new=AsyncMock(return_value=mock_response)
+    ) as mock_get:
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
+            mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+
+            processed = rss_fetcher.process_pages([1, 2, 3])
+
+    # Each page carries the same entry; it is parsed and stored once
+    assert processed == 1
+    assert mock_get.await_count == 3
+    requested = {call.args[0] for call in mock_get.await_args_list}
+    assert requested == {f"{rss_fetcher.feed_url}&p={p}" for p in (1, 2, 3)}
+    assert rss_fetcher.db.get_torrent_exists("abcdef1234567890abcdef1234567890abcdef12")
+
+
+def test_process_pages_skips_failed_page(rss_fetcher, mock_rss_response):
+    """Test that one failing page does not abort the other pages."""
+    import httpx
+
+    mock_response = Mock()
+    mock_response.text = mock_rss_response
+    mock_response.content = mock_rss_response.encode()
+    mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+
+    with patch.object(
+        httpx.AsyncClient,
+        "get",
+        new=AsyncMock(side_effect=[mock_response, Exception("HTTP Error")]),
+    ):
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
+            mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+
+            processed = rss_fetcher.process_pages([1, 2])
+
+    assert processed == 1
+
+
+def test_fetch_feed_sends_conditional_headers(rss_fetcher, mock_rss_response):
+    """Test that validators from the last fetch are sent on the next poll."""
+    first_response = Mock()
+    first_response.text = mock_rss_response
+    first_response.content = mock_rss_response.encode()
+    first_response.raise_for_status = Mock()
+    first_response.status_code = 200
+    first_response.headers = {
+        "ETag": '"abc123"',
+        "Last-Modified": "Wed, 01 Jan 2025 12:00:00 GMT",
+    }
+
+    not_modified = Mock()
+    not_modified.status_code = 304
+    not_modified.headers = {}
+
+    with (
+        patch.object(
+            rss_fetcher.client, "get", side_effect=[first_response, not_modified]
+        ) as mock_get,
+        patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit,
+    ):
+        mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+        assert rss_fetcher.process_feed() == 1
+        assert mock_get.call_args.kwargs["headers"] == {}
+
+        # Second poll is conditional and short-circuits on 304
+        assert rss_fetcher.fetch_feed() is None
+        assert mock_get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"abc123"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 12:00:00 GMT",
+        }
+        not_modified.raise_for_status.assert_not_called()
+
+
+def test_fetch_feed_caches_after_processing(rss_fetcher, mock_rss_response):
+    """Test that validators are only stored once the entries are processed."""
+    mock_response = Mock()
+    mock_response.text = mock_rss_response
+    mock_response.content = mock_rss_response.encode()
+    mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {"ETag": '"abc123"'}
+
+    with patch.object(rss_fetcher.client, "get", return_value=mock_response):
+        # Fetching alone stores nothing
+        assert rss_fetcher.fetch_feed() is not None
+        assert rss_fetcher.db.get_feed_cache(rss_fetcher.feed_url) is None
+
+        # Neither does a poll whose entries fail to be stored
+        with patch.object(
+            rss_fetcher.db, "insert_torrents_bulk", side_effect=Exception("DB error")
+        ):
+            with pytest.raises(Exception, match="DB error"):
+                rss_fetcher.process_feed()
+        assert rss_fetcher.db.get_feed_cache(rss_fetcher.feed_url) is None
+
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
+            mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+            assert rss_fetcher.process_feed() == 1
+        assert rss_fetcher.db.get_feed_cache(rss_fetcher.feed_url)["etag"] == (
+            '"abc123"'
+        )
+
+
+def test_process_feed_not_modified(rss_fetcher):
+    """Test that a 304 response processes nothing."""
+    not_modified = Mock()
+    not_modified.status_code = 304
+    not_modified.headers = {}
+
+    with patch.object(rss_fetcher.client, "get", return_value=not_modified):
+        with patch.object(rss_fetcher, "parse_entry") as mock_parse:
+            assert rss_fetcher.process_feed() == 0
+            mock_parse.assert_not_called()
+
+
+def test_fetch_feed_skips_unchanged_body(rss_fetcher, mock_rss_response):
+    """Test that an identical body is not parsed again without validators."""
+    mock_response = Mock()
+    mock_response.text = mock_rss_response
+    mock_response.content = mock_rss_response.encode()
+    mock_response.raise_for_status = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+
+    with patch.object(rss_fetcher.client, "get", return_value=mock_response):
+        with patch("nyaastats.rss_fetcher._guessit_api.guessit") as mock_guessit:
+            mock_guessit.return_value = {"title": "Test Anime", "episode": 1}
+
+            assert rss_fetcher.process_feed() == 1
+            assert rss_fetcher.process_feed() == 0
+            assert rss_fetcher.fetch_feed() is None
+
+
+def test_parse_feed_nyaa_fields():
+    """Test that the lxml parser exposes nyaa fields like feedparser did."""
+    from pathlib import Path
+
+    from nyaastats.rss_fetcher import parse_feed
+
+    content = (Path(__file__).parent / "fixtures" / "example.rss").read_bytes()
+    feed = parse_feed(content)
+
+    assert len(feed.entries) == 75
+    entry = feed.entries[0]
+    assert entry.title == "[LonelyChaser-Inka] Tongari Boushi no Memoru 12"
+    assert entry.guid == "https://nyaa.si/view/1993842"
+    assert entry.nyaa_infohash == "f87db04e1531c5f6fbaca3e6e2876f9c2982f46a"
+    assert entry.nyaa_size == "1.1 GiB"
+    assert entry.nyaa_trusted == "No"
+    assert entry.published == "Wed, 16 Jul 2025 01:53:15 -0000"
+    assert tuple(entry.published_parsed[:6]) == (2025, 7, 16, 1, 53, 15)
+    assert entry.get("missing", "Unknown") == "Unknown"
+    assert getattr(entry, "missing", "") == ""
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from whenever import Instant
 
 from nyaastats.models import StatsData, TorrentData
+from nyaastats.scheduler import Scheduler
 
 
 def test_get_due_torrents_never_scraped(scheduler):
@@ -284,6 +287,39 @@ def test_get_due_torrents_no_batch_limit(scheduler):
         assert infohash in infohashes
 
 
+def test_get_due_torrents_with_limit(scheduler):
+    """Test that a limit returns the most overdue torrents first."""
+    for i in range(5):
+        infohash = f"abcdef1234567890abcdef1234567890abcdef{i:02d}"
+        torrent_data = TorrentData(
+            infohash=infohash,
+            filename=f"test{i}.mkv",
+            pubdate=Instant.from_utc(2025, 1, 1, 9, 0, 0),  # 3 hours ago
+            size_bytes=1000000,
+            nyaa_id=12345 + i,
+            trusted=False,
+            remake=False,
+            seeders=5,
+            leechers=1,
+            downloads=50,
+        )
+        scheduler.db.insert_torrent(torrent_data)
+
+        # Later torrents were scraped longer ago
+        scheduler.db.insert_stats(
+            infohash,
+            StatsData(seeders=5, leechers=1, downloads=50),
+            Instant.from_utc(2025, 1, 1, 10, 50 - i * 10, 0),
+        )
+
+    due_torrents = scheduler.get_due_torrents_with_window(0, limit=2)
+
+    assert due_torrents == [
+        "abcdef1234567890abcdef1234567890abcdef04",
+        "abcdef1234567890abcdef1234567890abcdef03",
+    ]
+
+
 def test_get_metrics(scheduler):
     """Test getting system metrics."""
     # Insert various types of torrents
@@ -327,7 +363,8 @@ def test_get_metrics(scheduler):
     assert metrics["torrents_guessit_failed"] == 1
     assert metrics["stats_total"] >= 4  # Including initial RSS stats
     assert metrics["stats_recent"] >= 1
-    assert "queue_depth" in metrics
+    # Only the active torrent not scraped since its initial RSS stats is due
+    assert metrics["queue_depth"] == 1
 
 
 def test_get_torrent_scrape_schedule(scheduler):
@@ -442,3 +479,104 @@ def test_get_schedule_summary(scheduler):
     assert summary["daily"] == 1
     assert summary["dead"] == 1
     assert summary["never"] == 1
+
+
+def test_get_metrics_cached(temp_db, fixed_time):
+    """Test that metrics and summary are reused within the TTL."""
+    scheduler = Scheduler(temp_db, now_func=lambda: fixed_time, metrics_ttl=60)
+    uncached = Scheduler(temp_db, now_func=lambda: fixed_time, metrics_ttl=0)
+
+    assert scheduler.get_metrics()["torrents_total"] == 0
+    assert scheduler.get_schedule_summary() == {}
+
+    scheduler.db.insert_torrent(
+        TorrentData(
+            infohash="abcdef1234567890abcdef1234567890abcdef12",
+            filename="test.mkv",
+            pubdate=Instant.from_utc(2025, 1, 1, 11, 0, 0),
+            size_bytes=1000000,
+            nyaa_id=12345,
+            trusted=False,
+            remake=False,
+            seeders=5,
+            leechers=1,
+            downloads=50,
+        )
+    )
+
+    assert scheduler.get_metrics()["torrents_total"] == 0
+    assert scheduler.get_schedule_summary() == {}
+    assert uncached.get_metrics()["torrents_total"] == 1
+    assert uncached.get_schedule_summary() == {"hourly": 1}
+
+
+def test_get_metrics_cached_as_clock_advances(temp_db, fixed_time):
+    """Test that results are reused within the TTL as the clock moves on."""
+    clock = {"now": fixed_time, "monotonic": 1000.0}
+    scheduler = Scheduler(temp_db, now_func=lambda: clock["now"], metrics_ttl=10)
+
+    with patch("nyaastats.scheduler.time.monotonic", lambda: clock["monotonic"]):
+        metrics = scheduler.get_metrics()
+        summary = scheduler.get_schedule_summary()
+
+        # A poll a few seconds later, with different schedule bounds
+        clock["now"] = fixed_time.add(seconds=3)
+        clock["monotonic"] += 3
+        with patch.object(temp_db, "get_conn") as mock_get_conn:
+            assert scheduler.get_metrics() == metrics
+            assert scheduler.get_schedule_summary() == summary
+            mock_get_conn.assert_not_called()
+
+
+def test_get_metrics_recomputed_after_ttl(temp_db, fixed_time):
+    """Test that results are recomputed once the TTL has passed."""
+    clock = {"now": fixed_time, "monotonic": 1000.0}
+    scheduler = Scheduler(temp_db, now_func=lambda: clock["now"], metrics_ttl=10)
+
+    with patch("nyaastats.scheduler.time.monotonic", lambda: clock["monotonic"]):
+        assert scheduler.get_metrics()["torrents_total"] == 0
+        assert scheduler.get_schedule_summary() == {}
+
+        temp_db.insert_torrent(
+            TorrentData(
+                infohash="abcdef1234567890abcdef1234567890abcdef12",
+                filename="test.mkv",
+                pubdate=Instant.from_utc(2025, 1, 1, 11, 0, 0),
+                size_bytes=1000000,
+                nyaa_id=12345,
+                trusted=False,
+                remake=False,
+                seeders=5,
+                leechers=1,
+                downloads=50,
+            )
+        )
+
+        clock["now"] = fixed_time.add(seconds=11)
+        clock["monotonic"] += 11
+        metrics = scheduler.get_metrics()
+        assert metrics["torrents_total"] == 1
+        assert metrics["queue_depth"] == 1
+        assert scheduler.get_schedule_summary() == {"hourly": 1}
+
+
+def test_get_metrics_not_cached_by_default(temp_db, fixed_time):
+    """Test that caching is opt-in."""
+    scheduler = Scheduler(temp_db, now_func=lambda: fixed_time)
+
+    assert scheduler.get_metrics()["torrents_total"] == 0
+    temp_db.insert_torrent(
+        TorrentData(
+            infohash="abcdef1234567890abcdef1234567890abcdef12",
+            filename="test.mkv",
+            pubdate=Instant.from_utc(2025, 1, 1, 11, 0, 0),
+            size_bytes=1000000,
+            nyaa_id=12345,
+            trusted=False,
+            remake=False,
+            seeders=5,
+            leechers=1,
+            downloads=50,
+        )
+    )
+    assert scheduler.get_metrics()["torrents_total"] == 1
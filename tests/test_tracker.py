@@ -1,8 +1,9 @@
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from whenever import Instant
 
 from nyaastats.models import StatsData, TorrentData
+from nyaastats.tracker import TrackerScraper
 
 
 def test_scrape_batch_success(tracker_scraper):
@@ -260,19 +261,53 @@ def test_update_batch_stats(tracker_scraper):
         ),
     }
 
-    with patch.object(tracker_scraper, "update_stats") as mock_update:
-        tracker_scraper.update_batch_stats(results)
+    tracker_scraper.update_batch_stats(results)
+
+    # Check that stats were inserted for each torrent
+    for infohash, stats in results.items():
+        recent_stats = tracker_scraper.db.get_recent_stats(infohash, limit=1)
+        assert len(recent_stats) == 1
+        assert recent_stats[0]["seeders"] == stats.seeders
+        assert recent_stats[0]["leechers"] == stats.leechers
+        assert recent_stats[0]["downloads"] == stats.downloads
+
+
+def test_update_batch_stats_marks_dead(tracker_scraper):
+    """Test that update_batch_stats marks only torrents with 3 zero scrapes dead."""
+    dead_infohash = "abcdef1234567890abcdef1234567890abcdef12"
+    live_infohash = "fedcba0987654321fedcba0987654321fedcba09"
+    zero_stats = StatsData(seeders=0, leechers=0, downloads=0)
 
-        # Check that update_stats was called for each torrent
-        assert mock_update.call_count == 2
-        mock_update.assert_any_call(
-            "abcdef1234567890abcdef1234567890abcdef12",
-            StatsData(seeders=10, leechers=2, downloads=100),
+    for infohash in (dead_infohash, live_infohash):
+        tracker_scraper.db.insert_torrent(
+            TorrentData(
+                infohash=infohash,
+                filename="test.mkv",
+                pubdate=Instant.from_utc(2025, 1, 1, 10, 0, 0),
+                size_bytes=1000000,
+                nyaa_id=12345,
+                trusted=False,
+                remake=False,
+                seeders=0,
+                leechers=0,
+                downloads=0,
+                guessit_data=None,
+            )
         )
-        mock_update.assert_any_call(
-            "fedcba0987654321fedcba0987654321fedcba09",
-            StatsData(seeders=5, leechers=1, downloads=50),
+    # The dead torrent has two zero scrapes on top of its zero RSS stats
+    tracker_scraper.db.insert_stats(
+        dead_infohash, zero_stats, Instant.from_utc(2025, 1, 1, 11, 0, 0)
+    )
+
+    tracker_scraper.update_batch_stats(
+        {dead_infohash: zero_stats, live_infohash: zero_stats}
+    )
+
+    with tracker_scraper.db.get_conn() as conn:
+        statuses = dict(
+            conn.execute("SELECT infohash, status FROM torrents").fetchall()
         )
+    assert statuses == {dead_infohash: "dead", live_infohash: "active"}
 
 
 def test_scrape_batch_url_encoding(tracker_scraper):
@@ -397,3 +432,157 @@ def test_http_error_does_not_count_toward_dead_detection(tracker_scraper):
         )
         row = cursor.fetchone()
         assert row["status"] == "active"
+
+
+def test_scrape_batches_concurrently(tracker_scraper):
+    """Test scraping several batches through the async client."""
+    import httpx
+
+    batches = [
+        ["abcdef1234567890abcdef1234567890abcdef12"],
+        ["fedcba0987654321fedcba0987654321fedcba09"],
+    ]
+
+    def decode(content):
+        infohash = content.decode()
+        return {
+            b"files": {
+                bytes.fromhex(infohash): {
+                    b"complete": 3,
+                    b"incomplete": 1,
+                    b"downloaded": 7,
+                }
+            }
+        }
+
+    async def get(self, url):
+        response = Mock()
+        response.raise_for_status = Mock()
+        # Echo the requested infohash back so results can be told apart
+        response.content = url.split("info_hash=")[1].replace("%", "").encode()
+        return response
+
+    with patch.object(httpx.AsyncClient, "get", new=get):
+        with patch("nyaastats.tracker.bencodepy.decode", side_effect=decode):
+            results = tracker_scraper.scrape_batches(batches, max_concurrent=2)
+
+    stats = StatsData(seeders=3, leechers=1, downloads=7)
+    assert results == [
+        {"abcdef1234567890abcdef1234567890abcdef12": stats},
+        {"fedcba0987654321fedcba0987654321fedcba09": stats},
+    ]
+
+
+def test_scrape_batches_failed_batch(tracker_scraper):
+    """Test that one failing batch yields no stats without affecting others."""
+    import httpx
+
+    mock_response = Mock()
+    mock_response.content = b"dummy"
+    mock_response.raise_for_status = Mock()
+
+    with patch.object(
+        httpx.AsyncClient,
+        "get",
+        new=AsyncMock(side_effect=[Exception("HTTP Error"), mock_response]),
+    ):
+        with patch("nyaastats.tracker.bencodepy.decode") as mock_decode:
+            mock_decode.return_value = {b"files": {}}
+            results = tracker_scraper.scrape_batches(
+                [
+                    ["abcdef1234567890abcdef1234567890abcdef12"],
+                    ["fedcba0987654321fedcba0987654321fedcba09"],
+                ],
+                max_concurrent=1,
+            )
+
+    assert results == [
+        {},
+        {
+            "fedcba0987654321fedcba0987654321fedcba09": StatsData(
+                seeders=0, leechers=0, downloads=0
+            )
+        },
+    ]
+
+
+def test_scrape_batch_uses_fast_decoder(tracker_scraper):
+    """Test that the optional Cython bencode decoder is used when available."""
+    infohash = "abcdef1234567890abcdef1234567890abcdef12"
+
+    mock_response = Mock()
+    mock_response.content = b"dummy"
+    mock_response.raise_for_status = Mock()
+    fast_decode = Mock(
+        return_value={
+            b"files": {
+                bytes.fromhex(infohash): {
+                    b"complete": 4,
+                    b"incomplete": 2,
+                    b"downloaded": 9,
+                }
+            }
+        }
+    )
+
+    with patch.object(tracker_scraper.client, "get", return_value=mock_response):
+        with patch("nyaastats.tracker._fast_bdecode", new=fast_decode):
+            with patch("nyaastats.tracker.bencodepy.decode") as slow_decode:
+                results = tracker_scraper.scrape_batch([infohash])
+
+    fast_decode.assert_called_once_with(b"dummy")
+    slow_decode.assert_not_called()
+    assert results == {infohash: StatsData(seeders=4, leechers=2, downloads=9)}
+
+
+def test_update_batch_stats_checks_only_zero_scrapes(tracker_scraper):
+    """Test that only torrents with an all-zero scrape are checked for death."""
+    zero_infohash = "abcdef1234567890abcdef1234567890abcdef12"
+    live_infohash = "fedcba0987654321fedcba0987654321fedcba09"
+
+    with patch.object(
+        tracker_scraper.db, "get_dead_torrents", return_value=[]
+    ) as mock_dead:
+        tracker_scraper.update_batch_stats(
+            {
+                zero_infohash: StatsData(seeders=0, leechers=0, downloads=0),
+                live_infohash: StatsData(seeders=0, leechers=0, downloads=3),
+            }
+        )
+        mock_dead.assert_called_once_with([zero_infohash], scrapes=3)
+
+        mock_dead.reset_mock()
+        tracker_scraper.update_stats(
+            live_infohash, StatsData(seeders=1, leechers=0, downloads=0)
+        )
+        mock_dead.assert_not_called()
+
+
+def test_update_batch_stats_shares_timestamp(temp_db, mock_client):
+    """Test that all stats from one batch are stored with a single timestamp."""
+    from itertools import count
+
+    # Every call to the clock moves it forward a minute
+    minutes = count()
+    scraper = TrackerScraper(
+        temp_db,
+        mock_client,
+        now_func=lambda: Instant.from_utc(2025, 1, 1, 12, next(minutes), 0),
+    )
+    infohashes = [
+        "abcdef1234567890abcdef1234567890abcdef12",
+        "fedcba0987654321fedcba0987654321fedcba09",
+    ]
+
+    scraper.update_batch_stats(
+        {
+            infohash: StatsData(seeders=1, leechers=1, downloads=1)
+            for infohash in infohashes
+        }
+    )
+
+    timestamps = {
+        temp_db.get_recent_stats(infohash, limit=1)[0]["timestamp"]
+        for infohash in infohashes
+    }
+    assert timestamps == {"2025-01-01T12:00:00Z"}